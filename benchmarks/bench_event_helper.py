@@ -0,0 +1,64 @@
+"""Compares sending calendar requests with event-helper protocols 1 and 2.
+
+Run with ``python benchmarks/bench_event_helper.py``. The helper is the
+stand-in from ``tests/event_helper_stub.py``, so the numbers measure the
+cost of the pipe and the protocol rather than of a real calendar.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from ptsched.event_helper import UPDATE, HelperSession, Request
+
+STUB = os.path.join(os.path.dirname(__file__), "..", "tests", "event_helper_stub.py")
+
+
+def requests(count):
+    for number in range(count):
+        yield Request(
+            UPDATE,
+            f"event{number}",
+            "2024-03-04",
+            "History 201:\nRead chapter 12\n\nPhysics 150:\nProblem set 3",
+        )
+
+
+def flush_each_request(count):
+    # How syscal drove protocol 1 before HelperSession.
+    with HelperSession([sys.executable, STUB], protocol="1") as session:
+        for number, request in enumerate(requests(count)):
+            session.process.stdin.write(request.encode_v1(number))
+            session.process.stdin.flush()
+
+
+def send(count, protocol):
+    with HelperSession([sys.executable, STUB], protocol=protocol) as session:
+        for request in requests(count):
+            session.send(request)
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument(
+        "--requests", type=int, nargs="+", default=[100, 10000]
+    )
+    args = argument_parser.parse_args()
+
+    print(f"{'requests':>9} {'v1, flush each':>15} {'v1':>8} {'v2':>8}  (ms)")
+    for count in args.requests:
+        times = []
+        for function, arguments in [
+            (flush_each_request, ()),
+            (send, ("1",)),
+            (send, ("2",)),
+        ]:
+            start = time.perf_counter()
+            function(count, *arguments)
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"{count:9d} {times[0]:15.1f} {times[1]:8.1f} {times[2]:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
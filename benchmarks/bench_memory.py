@@ -0,0 +1,135 @@
+"""Compares the memory held by parsed schedules using the slotted structures,
+with dates kept as datetime.date, against the unslotted structures with ISO
+string dates that they replaced.
+
+Each schedule is parsed once and then copied into both sets of classes; the
+memory retained by the copies is measured with tracemalloc. The task names
+are shared with the parsed schedules, so only the structures themselves are
+counted. The size of the pickles the parse cache stores is reported too.
+
+Run with ``python benchmarks/bench_memory.py``.
+"""
+
+import argparse
+import datetime
+import gc
+import pickle
+import sys
+import tracemalloc
+
+from ptsched import structures
+from ptsched.parse.parse import parse_str
+from synthetic import synthetic_schedule
+
+
+# The structures as they were before __slots__ and date objects, kept for
+# comparison.
+class Task:
+    def __init__(self, name):
+        self.name = name
+
+
+class SchoolClassTransformed:
+    def __init__(self, name, tasks):
+        self.name = name
+        self.tasks = tasks
+
+
+class DayTransformed:
+    def __init__(self, date, classes):
+        self.date = date
+        self.classes = classes
+
+
+class ScheduleTransformed:
+    class Metadata:
+        def __init__(self, start_date, end_date):
+            self.start_date = start_date
+            self.end_date = end_date
+
+    def __init__(self, metadata, days):
+        self.metadata = metadata
+        self.days = days
+
+
+def copy_schedule(schedule, module, date):
+    return module.ScheduleTransformed(
+        module.ScheduleTransformed.Metadata(
+            schedule.metadata.start_date, schedule.metadata.end_date
+        ),
+        [
+            module.DayTransformed(
+                date(day.date),
+                [
+                    module.SchoolClassTransformed(
+                        class_.name, [module.Task(task.name) for task in class_.tasks]
+                    )
+                    for class_ in day.classes
+                ],
+            )
+            for day in schedule.days
+        ],
+    )
+
+
+def retained(function, *args):
+    """Returns the bytes still allocated by ``function`` once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--files", type=int, default=50)
+    argument_parser.add_argument("--classes", type=int, nargs="+", default=[5, 20])
+    args = argument_parser.parse_args()
+
+    print(
+        f"{'classes':>8} {'layout':>10} {'KiB':>10} {'bytes/task':>11} "
+        f"{'pickle KiB':>11}"
+    )
+    for classes in args.classes:
+        schedules = [
+            parse_str(
+                synthetic_schedule(
+                    classes,
+                    start_date=datetime.date(2024, 1, 1)
+                    + datetime.timedelta(days=28 * (number % 12)),
+                ),
+                f"{number}.ptsched",
+            )
+            for number in range(args.files)
+        ]
+        tasks = sum(
+            len(class_.tasks)
+            for schedule in schedules
+            for day in schedule.days
+            for class_ in day.classes
+        )
+        for name, module, date in [
+            ("before", sys.modules[__name__], datetime.date.isoformat),
+            ("slotted", structures, lambda date: date),
+        ]:
+            size = retained(
+                lambda: [
+                    copy_schedule(schedule, module, date) for schedule in schedules
+                ]
+            )
+            pickled = sum(
+                len(pickle.dumps(copy_schedule(schedule, module, date)))
+                for schedule in schedules
+            )
+            print(
+                f"{classes:>8} {name:>10} {size / 1024:>10.1f} {size / tasks:>11.1f} "
+                f"{pickled / 1024:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
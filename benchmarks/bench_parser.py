@@ -0,0 +1,108 @@
+"""Compares the LALR parser with the Earley parser it replaced.
+
+Run with ``python benchmarks/bench_parser.py``.
+"""
+
+import argparse
+import time
+
+from lark import Lark
+
+from ptsched.parse.parser import get_parser
+from synthetic import synthetic_schedule
+
+# The grammar as it was before the switch to LALR, kept for comparison.
+EARLEY_GRAMMAR = r"""
+%import common.WS -> _WS
+%import common.WS_INLINE -> _WSI
+%import common.NEWLINE -> _NEWLINE
+
+_NEWLINE_BREAK: _WS? _NEWLINE _WS?
+
+schedule: _WS? metadata _NEWLINE_BREAK body _WS?
+
+metadata: _WSI? date _WSI "-" _WSI date _WSI?
+
+date: day_of_month _WSI month _WSI year
+day_of_month: /\d{1,2}/
+year: /\d{4}/
+month: january | february | march | april | may | june | july | august | september | october | november | december
+january: "January" | "Jan"
+february: "February" | "Feb"
+march: "March" | "Mar"
+april: "April" | "Apr"
+may: "May"
+june: "June" | "Jun"
+july: "July" | "Jul"
+august: "August" | "Aug"
+september: "September" | "Sep"
+october: "October" | "Oct"
+november: "November" | "Nov"
+december: "December" | "Dec"
+
+body: (class_ _NEWLINE_BREAK)* class_?
+
+class_: class_declaration _NEWLINE_BREAK day_list
+class_declaration: _WSI? "#" _WSI _class_identifier _WSI?
+_class_identifier: /[^\n]+/
+
+day_list: (class_day_tasks _NEWLINE_BREAK)* class_day_tasks?
+
+class_day_tasks: date_declaration (_NEWLINE_BREAK task_list)?
+date_declaration: _WSI? "-" _WSI _date_specifier _WSI?
+_date_specifier: day_of_week _WSI day_of_month
+day_of_week: monday | tuesday | wednesday | thursday | friday | saturday | sunday
+monday: "Monday" | "Mon"
+tuesday: "Tuesday" | "Tue"
+wednesday: "Wednesday" | "Wed"
+thursday: "Thursday" | "Thu"
+friday: "Friday" | "Fri"
+saturday: "Saturday" | "Sat"
+sunday: "Sunday" | "Sun"
+
+task_list: (task _NEWLINE_BREAK)* task?
+
+task: _WSI? _task_identifier _WSI?
+_task_identifier: /[^-#][^\n]*/
+"""
+
+
+def best_of(repeat, function, *args):
+    result = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        result = min(result, time.perf_counter() - start)
+    return result
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument("--classes", type=int, nargs="+", default=[5, 20, 50])
+    argument_parser.add_argument(
+        "--skip-earley", action="store_true", help="Only time the LALR parser"
+    )
+    args = argument_parser.parse_args()
+
+    earley_parser = None
+    if not args.skip_earley:
+        earley_parser = Lark(EARLEY_GRAMMAR, start="schedule", propagate_positions=True)
+
+    print(f"{'lines':>8} {'LALR lines/s':>14} {'Earley lines/s':>16} {'speedup':>8}")
+    for classes in args.classes:
+        contents = synthetic_schedule(classes)
+        lines = contents.count("\n") + 1
+        lalr_time = best_of(args.repeat, get_parser().parse, contents)
+        if earley_parser is None:
+            print(f"{lines:8d} {lines / lalr_time:14.0f} {'-':>16} {'-':>8}")
+            continue
+        earley_time = best_of(args.repeat, earley_parser.parse, contents)
+        print(
+            f"{lines:8d} {lines / lalr_time:14.0f} {lines / earley_time:16.0f} "
+            f"{earley_time / lalr_time:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compares the os.scandir scanner, with and without its directory index,
+with the os.walk loop it replaced, on a synthetic ptsched directory.
+
+The directory has ``--terms`` terms of ``--classes`` class directories with a
+few schedule files each, and an ``out`` directory and a ``.git`` directory of
+similar size, which the old loop descended into.
+
+Run with ``python benchmarks/bench_scan.py``.
+"""
+
+import argparse
+import os
+import pathlib
+import tempfile
+
+from ptsched import utils
+from bench_parser import best_of
+
+
+def walk_find_files(dir):
+    # utils.find_files as it was before the scandir scanner, kept for
+    # comparison.
+    result = []
+    path = pathlib.Path(dir)
+    for directory, _, files in os.walk(str(path)):
+        if ".ptschedignore" in files:
+            continue
+        for file in files:
+            if file.endswith(".ptsched"):
+                result.append(str(pathlib.Path(directory).joinpath(file)))
+    return result
+
+
+def make_tree(root, terms, classes):
+    for term in range(terms):
+        for class_number in range(classes):
+            for top in ("", "out", ".git/objects"):
+                directory = os.path.join(
+                    root, top, f"term-{term}", f"class-{class_number}"
+                )
+                os.makedirs(directory)
+                for week in range(4):
+                    suffix = ".ptsched" if top == "" else ".md"
+                    with open(os.path.join(directory, f"week-{week}{suffix}"), "w"):
+                        pass
+                with open(os.path.join(directory, "notes.txt"), "w"):
+                    pass
+    # Make every directory old enough for the index to trust.
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, ns=(0, 0))
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    argument_parser.add_argument("--terms", type=int, default=8)
+    argument_parser.add_argument("--classes", type=int, default=50)
+    args = argument_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, args.terms, args.classes)
+        index = utils.ScanIndex()
+        utils.find_files(root, index)
+        assert sorted(utils.find_files(root, index)) == sorted(
+            file for file in walk_find_files(root) if "/out/" not in file
+        )
+
+        print(f"{'scanner':>16} {'ms':>8}")
+        for name, function in [
+            ("os.walk", lambda: walk_find_files(root)),
+            ("scandir", lambda: utils.find_files(root)),
+            ("scandir + index", lambda: utils.find_files(root, index)),
+        ]:
+            print(f"{name:>16} {best_of(args.repeat, function) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Times the pivots between ScheduleTransformed and ScheduleReverse on
+synthetic schedules of increasing size.
+
+Both pivots group by a dict in one pass, so the time per class-day should
+stay flat as the schedule grows.
+
+Run with ``python benchmarks/bench_structures.py``.
+"""
+
+import argparse
+
+from ptsched.parse.parse import parse_str
+from bench_parser import best_of
+from synthetic import synthetic_schedule
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    argument_parser.add_argument(
+        "--classes", type=int, nargs="+", default=[10, 50, 200, 1000]
+    )
+    args = argument_parser.parse_args()
+
+    print(
+        f"{'classes':>8} {'class-days':>11} {'to_reverse ms':>14} "
+        f"{'to_transformed ms':>18} {'us/class-day':>13}"
+    )
+    for classes in args.classes:
+        schedule = parse_str(synthetic_schedule(classes), "bench.ptsched")
+        reverse = schedule.to_reverse()
+        class_days = sum(len(day.classes) for day in schedule.days)
+
+        to_reverse = best_of(args.repeat, schedule.to_reverse)
+        to_transformed = best_of(args.repeat, reverse.to_transformed)
+        per_class_day = (to_reverse + to_transformed) / class_days * 1e6
+        print(
+            f"{classes:>8} {class_days:>11} {to_reverse * 1000:>14.2f} "
+            f"{to_transformed * 1000:>18.2f} {per_class_day:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compares cold and warm template rendering.
+
+Run with ``python benchmarks/bench_templates.py``. Each row renders every
+day of a synthetic schedule in the default and markdown formats:
+
+- per-call compile: a new Template built from source for each render, as
+  ptsched did before templates were cached;
+- cold process, empty cache: the first render in a new process with no
+  compiled modules on disk;
+- cold process, disk cache: the first render in a new process that imports
+  the modules Mako left in the cache directory;
+- warm: later renders in the same process.
+"""
+
+import argparse
+import importlib.resources
+import os
+import subprocess
+import sys
+import tempfile
+
+from mako.template import Template
+
+from ptsched.parse.scanner import scan_schedule
+from ptsched.parse.templates import get_template
+from bench_parser import best_of
+from synthetic import synthetic_schedule
+
+COLD_SCRIPT = """
+import sys, time
+sys.path.insert(0, {benchmarks!r})
+from synthetic import synthetic_schedule
+from ptsched.parse.scanner import scan_schedule
+schedule = scan_schedule(synthetic_schedule({classes}))
+start = time.perf_counter()
+from ptsched.parse.templates import get_template
+for name in ("default", "markdown"):
+    template = get_template(name)
+    for day in schedule.days:
+        template.render(day=day)
+print(time.perf_counter() - start)
+"""
+
+
+def render_uncached(schedule):
+    for name in ("default", "markdown"):
+        source = (
+            importlib.resources.files("ptsched") / "data" / "templates" / f"{name}.mako"
+        ).read_text(encoding="utf-8")
+        for day in schedule.days:
+            Template(source).render(day=day)
+
+
+def render_cached(schedule):
+    for name in ("default", "markdown"):
+        template = get_template(name)
+        for day in schedule.days:
+            template.render(day=day)
+
+
+def cold_render(classes, cache_home):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            COLD_SCRIPT.format(
+                benchmarks=os.path.dirname(os.path.abspath(__file__)), classes=classes
+            ),
+        ],
+        env=dict(os.environ, XDG_CACHE_HOME=cache_home),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout)
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument("--classes", type=int, default=10)
+    args = argument_parser.parse_args()
+
+    schedule = scan_schedule(synthetic_schedule(args.classes))
+
+    with tempfile.TemporaryDirectory() as cache_home:
+        empty_cache = cold_render(args.classes, cache_home)
+        disk_cache = min(
+            cold_render(args.classes, cache_home) for _ in range(args.repeat)
+        )
+
+    rows = [
+        ("per-call compile", best_of(args.repeat, render_uncached, schedule)),
+        ("cold process, empty cache", empty_cache),
+        ("cold process, disk cache", disk_cache),
+        ("warm", best_of(args.repeat, render_cached, schedule)),
+    ]
+    print(f"{'':26} {'ms':>8}  ({len(schedule.days)} days, 2 formats)")
+    for label, seconds in rows:
+        print(f"{label:26} {seconds * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compares the structural checkbox merge with the difflib merge it replaced.
+
+Run with ``python benchmarks/bench_update.py``.
+"""
+
+import argparse
+import difflib
+import io
+import re
+
+from ptsched.parse.outputs import write_markdown
+from ptsched.parse.scanner import scan_schedule
+from ptsched.update import update_str
+from bench_parser import best_of
+from synthetic import synthetic_schedule
+
+
+def difflib_update_str(new_schedule, current_schedule):
+    # update_str as it was before the structural merge, kept for comparison.
+    current_schedule_stripped = re.sub(r"\[x\]", "[ ]", current_schedule)
+
+    diff_result = difflib.Differ().compare(
+        current_schedule_stripped.splitlines(), new_schedule.splitlines()
+    )
+
+    output_string = ""
+    current_schedule_lines = current_schedule.splitlines()
+    current_line = 0
+    for line in diff_result:
+        if line.startswith("?"):
+            continue
+        elif line.startswith("+"):
+            output_string += re.sub(r"^\+ ", "", line) + "\n"
+        elif line.startswith("-"):
+            current_line += 1
+        elif line.startswith(" "):
+            if "[x]" in current_schedule_lines[current_line]:
+                output_string += re.sub(r"\[ \]", "[x]", line[2:]) + "\n"
+            else:
+                output_string += line[2:] + "\n"
+            current_line += 1
+
+    return output_string
+
+
+def markdown(classes):
+    outfile = io.StringIO()
+    write_markdown(scan_schedule(synthetic_schedule(classes)), outfile)
+    return outfile.getvalue()
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument("--classes", type=int, nargs="+", default=[2, 8, 32])
+    args = argument_parser.parse_args()
+
+    print(f"{'lines':>7} {'structural ms':>14} {'difflib ms':>11} {'speedup':>8}")
+    for classes in args.classes:
+        current = markdown(classes).replace(
+            "- [ ] Read chapter 1 ", "- [x] Read chapter 1 "
+        )
+        # An edit that shifts every later line.
+        new = markdown(classes).replace("- [ ] Read chapter 0 of unit 3\n", "", 1)
+        lines = new.count("\n")
+        structural = best_of(args.repeat, update_str, new, current)
+        differ = best_of(args.repeat, difflib_update_str, new, current)
+        print(
+            f"{lines:7d} {structural * 1000:14.2f} {differ * 1000:11.1f} "
+            f"{differ / structural:7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Shows that building a ScheduleTransformed scales linearly with the number
+of class days.
+
+Run with ``python benchmarks/bench_validate.py``. The time per class day
+should stay roughly flat as the schedule grows.
+"""
+
+import argparse
+
+from ptsched.parse.parser import get_parser
+from ptsched.parse.scanner import scan_schedule
+from ptsched.parse.transformer import ScheduleTransformer
+from ptsched.parse.validate import validate_schedule
+from bench_parser import best_of
+from synthetic import synthetic_schedule
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument(
+        "--classes", type=int, nargs="+", default=[5, 20, 80, 320]
+    )
+    argument_parser.add_argument("--days", type=int, nargs="+", default=[7, 28])
+    args = argument_parser.parse_args()
+
+    print(
+        f"{'classes':>8} {'days':>5} {'class days':>11} "
+        f"{'validate us/day':>16} {'scan us/day':>12}"
+    )
+    for days in args.days:
+        for classes in args.classes:
+            contents = synthetic_schedule(classes, days=days)
+            tree = ScheduleTransformer().transform(get_parser().parse(contents))
+            class_days = classes * days
+            validate_time = best_of(
+                args.repeat, validate_schedule, tree, contents, "synthetic.ptsched"
+            )
+            scan_time = best_of(args.repeat, scan_schedule, contents)
+            print(
+                f"{classes:8d} {days:5d} {class_days:11d} "
+                f"{validate_time / class_days * 1e6:16.2f} "
+                f"{scan_time / class_days * 1e6:12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Helpers for generating large, valid ptsched documents for benchmarks."""
+
+import datetime
+
+WEEKDAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def synthetic_schedule(
+    classes: int,
+    days: int = 28,
+    tasks: int = 3,
+    start_date: datetime.date = datetime.date(2024, 1, 1),
+) -> str:
+    """Returns a schedule with ``classes`` courses over ``days`` days.
+
+    ``days`` must keep the range within two calendar months, since ptsched
+    infers the month of a day declaration from the metadata range.
+    """
+    end_date = start_date + datetime.timedelta(days=days - 1)
+    lines = [
+        f"{start_date.day} {start_date.strftime('%B %Y')} - "
+        f"{end_date.day} {end_date.strftime('%B %Y')}",
+        "",
+    ]
+    for class_number in range(classes):
+        lines.append(f"# Course {class_number:04d}")
+        lines.append("")
+        for offset in range(days):
+            day = start_date + datetime.timedelta(days=offset)
+            lines.append(f"- {WEEKDAY_NAMES[day.weekday()]} {day.day}")
+            for task_number in range(tasks):
+                lines.append(f"Read chapter {task_number} of unit {offset}")
+            lines.append("")
+    return "\n".join(lines)
@@ -1,7 +1,42 @@
-from .main import main
-from .find import find
-from .schedule import schedule
-from .init import init
-from .parse import parse
+import importlib
+import sys
+import types
+
+# The public functions are imported on first access, so that importing
+# ptsched (or running a cheap subcommand such as find) does not load the
+# parser, the templates or multiprocessing.
+_EXPORTS = {
+    "main": "ptsched.main",
+    "find": "ptsched.find",
+    "schedule": "ptsched.schedule",
+    "init": "ptsched.init",
+    "parse": "ptsched.parse",
+}
 
 __all__ = ["main", "find", "schedule", "init", "parse"]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it on this package under the same name
+        # as the function it exports; keep resolving to the function, as
+        # ptsched did when these were imported eagerly.
+        if name in _EXPORTS and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
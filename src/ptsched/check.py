@@ -0,0 +1,254 @@
+"""Checks a whole directory of schedules against each other.
+
+Each file is validated on its own when it is parsed. ``ptsched check``
+also finds the problems between files:
+
+- two files that schedule the same class on the same day, and
+- gaps between consecutive files that no schedule covers, other than
+  weekends, since schedules usually run from Monday to Friday.
+
+The files are sorted by start date and swept once. Each (date, class) pair
+is looked up in a dict of the pairs scheduled so far, from which the pairs
+on days before the current file's start are dropped as the sweep passes
+them, so the dict only holds the days that later files can still overlap.
+"""
+
+import datetime
+import heapq
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import ptsched.utils as utils
+from ptsched.parse.error_handling import lark_error_handler
+from ptsched.parse.parse import parse_str_cached
+from ptsched.parse.scanner import CLASS_DECLARATION, DATE_DECLARATION, LINE_SPACE
+from ptsched.parse.utils import LineIndex, display_error_line
+from ptsched.parse.validate import ValidationErrors
+from ptsched.structures import ScheduleTransformed
+from lark.exceptions import UnexpectedInput
+
+
+def check_cmd(arguments):
+    check(**vars(arguments))
+
+
+class Conflict:
+    """A class scheduled on the same day by two files."""
+
+    def __init__(
+        self, date: datetime.date, class_name: str, first_file: str, second_file: str
+    ):
+        self.date = date
+        self.class_name = class_name
+        self.first_file = first_file
+        self.second_file = second_file
+
+
+class Gap:
+    """Days between two consecutive files that neither covers."""
+
+    def __init__(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        previous_file: str,
+        next_file: str,
+    ):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.previous_file = previous_file
+        self.next_file = next_file
+
+
+def check_schedules(
+    schedules: List[Tuple[str, ScheduleTransformed]], weekend_gaps=False
+) -> Tuple[List[Conflict], List[Gap]]:
+    """Finds the conflicts and gaps between the given files and their
+    schedules. Gaps of only a Saturday and Sunday are left out unless
+    ``weekend_gaps``."""
+    conflicts = []
+    gaps = []
+    scheduled: Dict[Tuple[datetime.date, str], str] = {}
+    # The (date, class) keys in ``scheduled``, by date.
+    expiry: List[Tuple[datetime.date, str]] = []
+    reach: Optional[datetime.date] = None
+    reach_file = None
+
+    for filename, schedule in sorted(
+        schedules,
+        key=lambda entry: (
+            entry[1].metadata.start_date,
+            entry[1].metadata.end_date,
+            entry[0],
+        ),
+    ):
+        start_date = schedule.metadata.start_date
+        end_date = schedule.metadata.end_date
+        if reach is not None and start_date > reach + datetime.timedelta(days=1):
+            gap = Gap(
+                reach + datetime.timedelta(days=1),
+                start_date - datetime.timedelta(days=1),
+                reach_file,
+                filename,
+            )
+            if weekend_gaps or not is_weekend(gap.start_date, gap.end_date):
+                gaps.append(gap)
+
+        # No file from here on starts before this one, so days before its
+        # start cannot be scheduled again.
+        while expiry and expiry[0][0] < start_date:
+            del scheduled[heapq.heappop(expiry)]
+
+        for day in schedule.days:
+            for class_ in day.classes:
+                key = (day.date, class_.name)
+                first_file = scheduled.get(key)
+                if first_file is not None:
+                    conflicts.append(
+                        Conflict(day.date, class_.name, first_file, filename)
+                    )
+                else:
+                    scheduled[key] = filename
+                    heapq.heappush(expiry, key)
+
+        if reach is None or end_date > reach:
+            reach = end_date
+            reach_file = filename
+
+    return conflicts, gaps
+
+
+def is_weekend(start_date: datetime.date, end_date: datetime.date) -> bool:
+    """Returns whether every day from ``start_date`` to ``end_date`` is a
+    Saturday or Sunday."""
+    return (end_date - start_date).days < 2 and all(
+        date.weekday() >= 5 for date in (start_date, end_date)
+    )
+
+
+def locate_class_day(
+    line_index: LineIndex, class_name: str, date: Optional[datetime.date] = None
+) -> Tuple[int, int, int]:
+    """Returns the line and columns of the declaration of ``date`` under the
+    class ``class_name``, or of the class itself if ``date`` is None, or of
+    the first line if neither is found."""
+    day_of_month = date.day if date else None
+    found = None
+    in_class = False
+    for lineno in range(1, len(line_index) + 1):
+        text = line_index.line(lineno)
+        line = text.lstrip(LINE_SPACE)
+        column = len(text) - len(line) + 1
+        end_column = len(text.rstrip(LINE_SPACE)) + 1
+        declaration = CLASS_DECLARATION.match(line)
+        if declaration is not None:
+            in_class = line[declaration.end() :] == class_name
+            if in_class:
+                found = (lineno, column, end_column)
+                if day_of_month is None:
+                    return found
+            continue
+        if in_class and day_of_month is not None:
+            day = DATE_DECLARATION.fullmatch(line)
+            if day is not None and int(day[2]) == day_of_month:
+                return (lineno, column, end_column)
+    return found or (1, 1, 2)
+
+
+def metadata_location(line_index: LineIndex) -> Tuple[int, int, int]:
+    for lineno in range(1, len(line_index) + 1):
+        text = line_index.line(lineno)
+        if text.strip():
+            line = text.lstrip(LINE_SPACE)
+            return (
+                lineno,
+                len(text) - len(line) + 1,
+                len(text.rstrip(LINE_SPACE)) + 1,
+            )
+    return (1, 1, 2)
+
+
+def format_conflict(conflict: Conflict, line_indexes: Dict[str, LineIndex]) -> str:
+    first_line, _, _ = locate_class_day(
+        line_indexes[conflict.first_file], conflict.class_name, conflict.date
+    )
+    lineno, column, end_column = locate_class_day(
+        line_indexes[conflict.second_file], conflict.class_name, conflict.date
+    )
+    return display_error_line(
+        f'"{conflict.class_name}" on {conflict.date.isoformat()} is also scheduled at '
+        f"{conflict.first_file}:{first_line}",
+        lineno,
+        column,
+        line_indexes[conflict.second_file],
+        conflict.second_file,
+        end_column,
+    )
+
+
+def format_gap(gap: Gap, line_indexes: Dict[str, LineIndex]) -> str:
+    lineno, column, end_column = metadata_location(line_indexes[gap.next_file])
+    days = (gap.end_date - gap.start_date).days + 1
+    if days == 1:
+        uncovered = f"1 day between {gap.previous_file} and this schedule is"
+    else:
+        uncovered = f"{days} days between {gap.previous_file} and this schedule are"
+    return display_error_line(
+        f"{uncovered} not covered ({gap.start_date.isoformat()} to "
+        f"{gap.end_date.isoformat()})",
+        lineno,
+        column,
+        line_indexes[gap.next_file],
+        gap.next_file,
+        end_column,
+        severity="Warning",
+    )
+
+
+def check(**kwargs):
+    directory = kwargs.get("directory") or os.getcwd()
+    index = utils.ScanIndex.for_directory(directory)
+    filenames = utils.find_files(directory, index)
+    if index is not None:
+        try:
+            index.save()
+        except OSError:
+            pass
+
+    schedules = []
+    line_indexes = {}
+    invalid = 0
+    for filename in filenames:
+        try:
+            with open(filename) as file:
+                contents = file.read()
+            schedules.append((filename, parse_str_cached(contents, filename)))
+            line_indexes[filename] = LineIndex(contents)
+        except (OSError, UnicodeDecodeError) as error:
+            print(f"Error when reading {filename}: {error}", file=sys.stderr)
+            invalid += 1
+        except UnexpectedInput as error:
+            print(lark_error_handler(error, contents, filename), file=sys.stderr)
+            invalid += 1
+        except ValidationErrors as error:
+            error.display_errors()
+            invalid += 1
+        except ValueError as error:
+            print(f"Error when checking {filename}: {error}", file=sys.stderr)
+            invalid += 1
+
+    conflicts, gaps = check_schedules(schedules, kwargs.get("weekend_gaps"))
+    for conflict in conflicts:
+        print(format_conflict(conflict, line_indexes), file=sys.stderr)
+    if not kwargs.get("no_gaps"):
+        for gap in gaps:
+            print(format_gap(gap, line_indexes), file=sys.stderr)
+
+    if not kwargs.get("quiet"):
+        print(
+            f"{len(filenames)} files checked: {invalid} invalid, "
+            f"{len(conflicts)} conflicts, {len(gaps)} gaps"
+        )
+    if invalid or conflicts:
+        exit(1)
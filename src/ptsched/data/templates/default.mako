@@ -0,0 +1,9 @@
+% for _class in day.classes:
+${_class.name + ":"}
+        % for task in _class.tasks:
+${task.name}
+        % endfor
+        % if not loop.last:
+
+        % endif
+    % endfor
@@ -0,0 +1,14 @@
+# Tasks: ${day.date}
+
+    % for _class in day.classes:
+${"##"} ${_class.name}
+        % if _class.tasks:
+
+        % endif
+        % for task in _class.tasks:
+- [ ] ${task.name}
+        % endfor
+        % if not loop.last:
+
+        % endif
+    % endfor
@@ -0,0 +1,382 @@
+"""Talks to the event-helper program that writes days to the system calendar.
+
+Protocol 1 is what event-helper has always spoken: each request is
+
+    <number>\\nUPDATE\\n<date>\\n<contents>\\nEND REQUEST\\n
+
+where <number> counts up from zero, and the helper's output is ignored.
+
+Whether a helper speaks protocol 2 is found by running it once with
+``--protocol-version`` and no input: a helper that speaks it writes the line
+``PTSCHED-EVENT-HELPER 2`` and exits. Any other helper, whether it rejects
+the argument or reads its empty input, is driven with protocol 1 and started
+with the same command line as ever. The answer is remembered in the user
+cache directory, keyed by the command and the program it runs, so a helper
+is only probed again once it is replaced. A helper that speaks protocol 2 is
+started with ``--protocol=2`` and first writes the same line; if it exits or
+stays silent instead, it is started again with protocol 1. Requests are sent
+in batches:
+
+    BATCH <sequence> <count>\\n
+    <operation> <event id> <date> <revision> <length>\\n<payload>\\n
+    ... (<count> requests)
+
+<payload> is <length> bytes of UTF-8, so it may contain any text. The
+operations are UPDATE (create or replace the event), DELETE (remove it) and
+NOOP (the event is unchanged and should be kept); only UPDATE has a payload,
+and the others send "-" as their revision. Event IDs are derived from the
+schedule's date range and the day, so the same day of the same schedule
+keeps its ID between runs, and the revision is derived from the payload.
+
+The helper answers each batch, in order, with ``ACK <sequence>`` or
+``ERROR <sequence> <message>``. At most ``window`` batches are sent before
+their acknowledgements are read.
+"""
+
+import contextlib
+import datetime
+import hashlib
+import importlib.resources as resources
+import json
+import os
+import queue
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+from typing import Dict, List, Optional
+
+import ptsched.utils as utils
+
+PROTOCOL_CHOICES = ("auto", "1", "2")
+GREETING = "PTSCHED-EVENT-HELPER 2"
+PROBE_ARGUMENT = "--protocol-version"
+# How long the helper gets to answer the probe, and to greet once started
+# with protocol 2.
+GREETING_TIMEOUT = 1.0
+REQUIRED_GREETING_TIMEOUT = 10.0
+BATCH_SIZE = 64
+WINDOW = 4
+HELPER_ENVIRONMENT_VARIABLE = "PTSCHED_EVENT_HELPER"
+PROTOCOL_CACHE_NAME = "event-helper-protocols.json"
+# Helpers whose protocol is remembered; the least recently probed are
+# forgotten first.
+PROTOCOL_CACHE_ENTRIES = 16
+
+UPDATE = "UPDATE"
+DELETE = "DELETE"
+NOOP = "NOOP"
+
+
+class HelperError(Exception):
+    """Raised when event-helper rejects a request or stops responding."""
+
+
+def event_id(start_date: datetime.date, end_date: datetime.date, date: str) -> str:
+    """Returns the stable ID of the event for one day of a schedule."""
+    key = f"{start_date.isoformat()}\0{end_date.isoformat()}\0{date}"
+    return hashlib.sha256(key.encode()).hexdigest()[:20]
+
+
+class Request:
+    """One operation on the calendar event for a day."""
+
+    def __init__(self, operation: str, event_id: str, date: str, payload: str = ""):
+        self.operation = operation
+        self.event_id = event_id
+        self.date = date
+        self.payload = payload
+
+    def revision(self) -> str:
+        if self.operation != UPDATE:
+            return "-"
+        return hashlib.sha256(self.payload.encode()).hexdigest()[:16]
+
+    def encode_v1(self, number: int) -> bytes:
+        return (
+            "%d\nUPDATE\n%s\n%s\nEND REQUEST\n" % (number, self.date, self.payload)
+        ).encode()
+
+    def encode_v2(self) -> bytes:
+        payload = self.payload.encode() if self.operation == UPDATE else b""
+        header = (
+            f"{self.operation} {self.event_id} {self.date} {self.revision()} "
+            f"{len(payload)}\n"
+        )
+        return header.encode() + payload + b"\n"
+
+
+def bundled_helper():
+    """Returns the event-helper installed with ptsched, or None."""
+    try:
+        helper = resources.files("ptsched.bin") / "event-helper"
+    except ModuleNotFoundError:
+        return None
+    return helper if helper.is_file() else None
+
+
+def helper_installed(override: Optional[str] = None) -> bool:
+    """Returns whether helper_command has a helper to start."""
+    return bool(
+        override
+        or os.environ.get(HELPER_ENVIRONMENT_VARIABLE)
+        or bundled_helper() is not None
+    )
+
+
+@contextlib.contextmanager
+def helper_command(override: Optional[str] = None):
+    """Yields the command line that starts event-helper.
+
+    ``override``, or else the PTSCHED_EVENT_HELPER environment variable, is
+    split like a shell command; otherwise the bundled helper is used. Raises
+    HelperError if there is no bundled helper.
+    """
+    override = override or os.environ.get(HELPER_ENVIRONMENT_VARIABLE)
+    if override:
+        yield shlex.split(override)
+        return
+
+    helper = bundled_helper()
+    if helper is None:
+        raise HelperError(
+            "event-helper is not installed; give one with --helper or "
+            f"${HELPER_ENVIRONMENT_VARIABLE}"
+        )
+    with resources.as_file(helper) as helper_path:
+        yield [str(helper_path)]
+
+
+def probe_protocol(command: List[str]) -> int:
+    """Runs the helper started by ``command`` to ask for the newest protocol
+    it speaks."""
+    try:
+        result = subprocess.run(
+            [*command, PROBE_ARGUMENT],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=GREETING_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return 1
+    greeting = result.stdout.decode(errors="replace").partition("\n")[0]
+    return 2 if greeting == GREETING else 1
+
+
+def helper_key(command: List[str]) -> str:
+    """Identifies a helper command together with the program it runs, so
+    that a replaced helper is probed again."""
+    parts = list(command)
+    try:
+        status = os.stat(shutil.which(command[0]) or command[0])
+        parts.append(f"{status.st_mtime_ns}:{status.st_size}")
+    except (OSError, ValueError):
+        pass
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()[:16]
+
+
+def load_protocols() -> Dict[str, int]:
+    try:
+        with open(utils.cache_directory() / PROTOCOL_CACHE_NAME) as cache_file:
+            protocols = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    return protocols if isinstance(protocols, dict) else {}
+
+
+def remember_protocol(command: List[str], version: int):
+    protocols = load_protocols()
+    key = helper_key(command)
+    protocols.pop(key, None)
+    protocols[key] = version
+    while len(protocols) > PROTOCOL_CACHE_ENTRIES:
+        del protocols[next(iter(protocols))]
+    path = utils.cache_directory() / PROTOCOL_CACHE_NAME
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        utils.write_if_changed(path, json.dumps(protocols))
+    except OSError:
+        pass
+
+
+def detect_protocol(command: List[str]) -> int:
+    """Returns the newest protocol that the helper started by ``command``
+    speaks, probing it only if that is not remembered."""
+    version = load_protocols().get(helper_key(command))
+    if version not in (1, 2):
+        version = probe_protocol(command)
+        remember_protocol(command, version)
+    return version
+
+
+class HelperSession:
+    """A running event-helper and the requests sent to it."""
+
+    def __init__(
+        self,
+        command: List[str],
+        protocol: str = "auto",
+        batch_size: int = BATCH_SIZE,
+        window: int = WINDOW,
+    ):
+        self.batch_size = batch_size
+        self.window = window
+        self.version: Optional[int] = None
+        self.requests_sent = 0
+        self.errors: List[str] = []
+        self._batch: List[Request] = []
+        self._sequence = 0
+        self._in_flight: List[int] = []
+        self._warned_v1 = False
+
+        if protocol == "auto":
+            offer_v2 = detect_protocol(command) == 2
+        else:
+            offer_v2 = protocol == "2"
+        if offer_v2:
+            self._start(command + ["--protocol=2"])
+            self.version = self._negotiate(required=protocol == "2")
+        if self.version != 2:
+            if offer_v2:
+                remember_protocol(command, 1)
+            self.version = 1
+            self._start(command)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.kill()
+
+    def kill(self):
+        """Stops the helper without waiting for outstanding requests."""
+        self.process.kill()
+        self.process.wait()
+
+    def _start(self, command: List[str]):
+        self.process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self._output = queue.Queue()
+        # Always drain the helper's output, so that it can never block on a
+        # full pipe.
+        self._reader = threading.Thread(
+            target=self._read_output, args=(self.process, self._output), daemon=True
+        )
+        self._reader.start()
+
+    def _read_output(self, process: subprocess.Popen, output: queue.Queue):
+        for line in process.stdout:
+            if self.version != 1:
+                output.put(line.decode(errors="replace").rstrip("\n"))
+        output.put(None)
+
+    def _negotiate(self, required: bool) -> Optional[int]:
+        """Waits for the greeting of a helper started with protocol 2, and
+        returns 2, or stops the helper and returns None if it does not
+        greet."""
+        try:
+            line = self._output.get(timeout=REQUIRED_GREETING_TIMEOUT)
+        except queue.Empty:
+            line = None
+        if line == GREETING:
+            return 2
+        self.kill()
+        self._reader.join()
+        if required:
+            raise HelperError("event-helper does not speak protocol 2")
+        return None
+
+    def send(self, request: Request):
+        if self.version == 1:
+            if request.operation == UPDATE:
+                try:
+                    self.process.stdin.write(request.encode_v1(self.requests_sent))
+                except BrokenPipeError:
+                    raise HelperError("event-helper exited early")
+                self.requests_sent += 1
+            elif request.operation == DELETE and not self._warned_v1:
+                print(
+                    "Warning: event-helper speaks protocol 1, which cannot delete "
+                    "events.",
+                    file=sys.stderr,
+                )
+                self._warned_v1 = True
+            return
+
+        self._batch.append(request)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Sends the pending batch."""
+        if self.version == 1:
+            try:
+                self.process.stdin.flush()
+            except BrokenPipeError:
+                raise HelperError("event-helper exited early")
+            return
+        if not self._batch:
+            return
+
+        self._wait_for_acknowledgements(self.window - 1)
+        self._sequence += 1
+        data = [f"BATCH {self._sequence} {len(self._batch)}\n".encode()]
+        data.extend(request.encode_v2() for request in self._batch)
+        try:
+            self.process.stdin.write(b"".join(data))
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            raise HelperError("event-helper exited early")
+        self._in_flight.append(self._sequence)
+        self.requests_sent += len(self._batch)
+        self._batch = []
+
+    def _wait_for_acknowledgements(self, in_flight: int):
+        while len(self._in_flight) > in_flight:
+            line = self._output.get()
+            if line is None:
+                raise HelperError(
+                    "event-helper exited with %d batches unacknowledged"
+                    % len(self._in_flight)
+                )
+            response, _, rest = line.partition(" ")
+            sequence, _, message = rest.partition(" ")
+            if response not in ("ACK", "ERROR") or not sequence.isdigit():
+                # Not an acknowledgement; helpers may log to stdout.
+                continue
+            if int(sequence) != self._in_flight[0]:
+                raise HelperError(
+                    "event-helper acknowledged batch %s, expected %d"
+                    % (sequence, self._in_flight[0])
+                )
+            self._in_flight.pop(0)
+            if response == "ERROR":
+                self.errors.append(message)
+
+    def close(self):
+        """Sends what is pending, waits for every acknowledgement and for
+        the helper to exit, and raises HelperError if anything failed."""
+        try:
+            self.flush()
+            if self.version == 2:
+                self._wait_for_acknowledgements(0)
+        finally:
+            try:
+                self.process.stdin.close()
+            except BrokenPipeError:
+                pass
+            self.process.wait()
+            self._reader.join()
+
+        if self.errors:
+            raise HelperError("; ".join(self.errors))
+        if self.process.returncode != 0:
+            raise HelperError(
+                "event-helper exited with status %d" % self.process.returncode
+            )
@@ -1,46 +1,203 @@
-import json
+"""Finds the schedule file that new work should be added to: the one
+covering a date (by default today), or else the one nearest to it.
+
+The date range of every schedule file in the default directory is kept in
+``.ptsched-cache/find-index.json`` there, and a file is only read again when
+its modification time or size changes. The ranges are kept sorted by start
+date together with, for each position, the range reaching furthest among
+those up to it, so that a lookup is a binary search.
+"""
+
+import bisect
 import datetime
+import json
+import pathlib
+import sys
+from typing import Dict, Iterable, List, Optional
 
 import ptsched.utils as utils
 
+INDEX_NAME = "find-index.json"
+INDEX_VERSION = 1
+
 
 def find_cmd(arguments):
     find(**vars(arguments))
 
 
 def find(**kwargs):
-    try:
-        with open(utils.config_path) as config_file:
-            config = json.load(config_file)
-            ptsched_directory = config["defaultDirectory"]
-
-            if kwargs.get("directory"):
-                print(ptsched_directory)
-                return
-
-            results = {}
-            for filename in utils.scan(ptsched_directory):
-                with open(filename) as file:
-                    result = {}
-                    utils.parse_dates(file.readline(), result, 1)
-                    date = datetime.datetime.now().timestamp()
-                    time = datetime.datetime.min.time()
-                    start_date = datetime.datetime.combine(
-                        result["start_date"], time
-                    ).timestamp()
-                    end_date = datetime.datetime.combine(
-                        result["end_date"], time
-                    ).timestamp()
-                    interval1 = abs(start_date - date)
-                    interval2 = abs(end_date - date)
-                    results[filename] = min(interval1, interval2)
-
-            def convert(key):
-                return results[key]
-
-            print(min(results.keys(), key=convert))
-
-    except FileNotFoundError:
+    ptsched_directory = utils.default_directory()
+    if ptsched_directory is None:
         print(
             "No ptsched configuration has been set. Run\n\n\tptsched --set-default\n\nin your directory of choice."
         )
+        return
+
+    if kwargs.get("directory"):
+        print(ptsched_directory)
+        return
+
+    date = datetime.date.today()
+    if kwargs.get("date"):
+        try:
+            date = datetime.date.fromisoformat(kwargs["date"])
+        except ValueError:
+            print(
+                "Invalid date (expected YYYY-MM-DD):", kwargs["date"], file=sys.stderr
+            )
+            exit(1)
+
+    cache_directory = pathlib.Path(ptsched_directory) / utils.CACHE_DIRECTORY_NAME
+    scan_index = utils.ScanIndex.load(cache_directory / utils.SCAN_INDEX_NAME)
+    index = DateIndex.load(cache_directory / INDEX_NAME)
+    changed = index.update(utils.find_files(ptsched_directory, scan_index))
+    try:
+        scan_index.save()
+        if changed:
+            index.save()
+    except OSError:
+        pass
+
+    filename = index.nearest(date)
+    if filename is None:
+        print("No schedule files found in", ptsched_directory, file=sys.stderr)
+        exit(1)
+    print(filename)
+
+
+def read_date_range(filename: str) -> Dict[str, Optional[str]]:
+    """Returns the date range of a schedule file as ISO dates, or Nones if
+    it does not start with one."""
+    result = {}
+    try:
+        with open(filename) as file:
+            for line_number, line in enumerate(file, 1):
+                if line.strip():
+                    utils.parse_dates(line, result, line_number)
+                    break
+    except (OSError, UnicodeDecodeError, ValueError):
+        pass
+    if "start_date" not in result:
+        return {"start": None, "end": None}
+    return {
+        "start": result["start_date"].isoformat(),
+        "end": result["end_date"].isoformat(),
+    }
+
+
+class DateIndex:
+    """The date range of every schedule file, by file and sorted by start.
+
+    Dates are kept as ISO strings, which sort in date order.
+    """
+
+    def __init__(self, path=None):
+        self.path = pathlib.Path(path) if path is not None else None
+        self.files: Dict[str, dict] = {}
+        # [start, end, filename], sorted.
+        self.intervals: List[list] = []
+        # reach[i] is the position of the interval with the latest end among
+        # intervals[: i + 1].
+        self.reach: List[int] = []
+
+    @classmethod
+    def load(cls, path) -> "DateIndex":
+        index = cls(path)
+        try:
+            with open(path) as index_file:
+                contents = json.load(index_file)
+            if contents.get("version") == INDEX_VERSION:
+                index.files = contents["files"]
+                index.intervals = contents["intervals"]
+                index.reach = contents["reach"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, AttributeError):
+            index = cls(path)
+        return index
+
+    def update(self, filenames: Iterable[str]) -> bool:
+        """Brings the index up to date with ``filenames``, reading only the
+        files that are new or have changed, and returns whether anything
+        changed."""
+        changed = False
+        present = set()
+        for filename in filenames:
+            present.add(filename)
+            state = utils.file_state(filename)
+            entry = self.files.get(filename)
+            if state is None or (
+                entry is not None
+                and entry["mtime"] == state["mtime"]
+                and entry["size"] == state["size"]
+            ):
+                continue
+            self.files[filename] = {**state, **read_date_range(filename)}
+            changed = True
+
+        for filename in self.files.keys() - present:
+            del self.files[filename]
+            changed = True
+
+        if changed:
+            self._sort()
+        return changed
+
+    def _sort(self):
+        self.intervals = sorted(
+            [entry["start"], entry["end"], filename]
+            for filename, entry in self.files.items()
+            if entry["start"] is not None
+        )
+        self.reach = []
+        for position, (_, end, _) in enumerate(self.intervals):
+            if not self.reach or end > self.intervals[self.reach[-1]][1]:
+                self.reach.append(position)
+            else:
+                self.reach.append(self.reach[-1])
+
+    def covering(self, date: datetime.date) -> Optional[str]:
+        """Returns a file whose range includes ``date``, or None."""
+        key = date.isoformat()
+        position = bisect.bisect_right(self.intervals, key, key=lambda row: row[0])
+        if position == 0:
+            return None
+        _, end, filename = self.intervals[self.reach[position - 1]]
+        return filename if end >= key else None
+
+    def nearest(self, date: datetime.date) -> Optional[str]:
+        """Returns a file whose range includes ``date``, or else the one
+        that ends or starts closest to it, preferring the one ahead."""
+        filename = self.covering(date)
+        if filename is not None:
+            return filename
+
+        position = bisect.bisect_right(
+            self.intervals, date.isoformat(), key=lambda row: row[0]
+        )
+        candidates = []
+        if position > 0:
+            # Every range starting up to ``date`` has ended before it; this
+            # one ended last.
+            _, end, filename = self.intervals[self.reach[position - 1]]
+            distance = (date - datetime.date.fromisoformat(end)).days
+            candidates.append((distance, 1, filename))
+        if position < len(self.intervals):
+            start, _, filename = self.intervals[position]
+            distance = (datetime.date.fromisoformat(start) - date).days
+            candidates.append((distance, 0, filename))
+        return min(candidates)[2] if candidates else None
+
+    def save(self):
+        utils.make_cache_directory(self.path.parent)
+        utils.write_if_changed(
+            self.path,
+            json.dumps(
+                {
+                    "version": INDEX_VERSION,
+                    "files": self.files,
+                    "intervals": self.intervals,
+                    "reach": self.reach,
+                }
+            ),
+        )
@@ -4,6 +4,7 @@ import sys
 import pathlib
 
 import ptsched.utils as utils
+from ptsched.manifest import MANIFEST_VERSION
 
 
 def init_cmd(arguments):
@@ -18,6 +19,7 @@ def init(**kwargs):
         except FileNotFoundError:
             config = {}
         config["defaultDirectory"] = str(pathlib.Path.cwd())
+        utils.config_path.parent.mkdir(parents=True, exist_ok=True)
         with open(utils.config_path, "w") as w_file:
             json.dump(config, w_file)
         return
@@ -27,10 +29,11 @@ def init(**kwargs):
             ptsched_directory = {}
             directory_id = uuid.uuid4().hex.upper()
             ptsched_directory["directoryID"] = directory_id
+            # The manifest starts empty; schedule records each file it renders.
+            ptsched_directory["manifestVersion"] = MANIFEST_VERSION
+            ptsched_directory["ptschedVersion"] = utils.ptsched_version()
             ptsched_directory["files"] = []
 
-            utils.update_directory(ptsched_directory)
-
             json.dump(ptsched_directory, directory_file)
     except FileExistsError:
         print("A ptsched directory already exists in this folder.", file=sys.stderr)
@@ -0,0 +1,70 @@
+"""Remembers what syscal last sent to the calendar.
+
+The ledger lives in ``.ptschedsync`` next to ``.ptscheddir``. For each
+schedule file, keyed by its path relative to the ptsched directory, it maps
+every event ID to the event's date and a digest of each class's part of the
+event, as last acknowledged by event-helper.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+from typing import Dict
+
+from ptsched.structures import DayTransformed
+
+LEDGER_NAME = ".ptschedsync"
+LEDGER_VERSION = 1
+
+
+def day_digests(day: DayTransformed) -> Dict[str, str]:
+    """Returns a digest of each class's tasks on a day, by class name."""
+    return {
+        class_.name: hashlib.sha256(
+            "\0".join([class_.name, *(task.name for task in class_.tasks)]).encode()
+        ).hexdigest()[:16]
+        for class_ in day.classes
+    }
+
+
+class SyncLedger:
+    def __init__(self, path: pathlib.Path, ptsched_directory: pathlib.Path):
+        self.path = path
+        self.ptsched_directory = ptsched_directory
+        self.files: Dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, ptsched_directory: pathlib.Path) -> "SyncLedger":
+        ledger = cls(ptsched_directory / LEDGER_NAME, ptsched_directory)
+        try:
+            with open(ledger.path) as ledger_file:
+                contents = json.load(ledger_file)
+            if contents.get("version") == LEDGER_VERSION:
+                ledger.files = contents["files"]
+        except (FileNotFoundError, ValueError, KeyError, AttributeError):
+            pass
+        return ledger
+
+    def key(self, filename: str) -> str:
+        return (
+            pathlib.Path(filename)
+            .absolute()
+            .relative_to(self.ptsched_directory)
+            .as_posix()
+        )
+
+    def events(self, filename: str) -> Dict[str, dict]:
+        """Returns the events last sent for a schedule file."""
+        return self.files.get(self.key(filename), {})
+
+    def record(self, filename: str, events: Dict[str, dict]):
+        self.files[self.key(filename)] = events
+
+    def save(self):
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path.parent, prefix=".ptschedsync-", delete=False
+        ) as tmp_file:
+            json.dump({"version": LEDGER_VERSION, "files": self.files}, tmp_file)
+        os.replace(tmp_file.name, self.path)
@@ -1,4 +1,5 @@
 import argparse
+import importlib
 
 # Syntax of schedule file
 
@@ -20,12 +21,38 @@ import argparse
 # - Mon 20
 # Task ABC
 
-from ptsched.parse import parse_cmd
-from ptsched.init import init_cmd
-from ptsched.syscal import syscal_cmd
-from ptsched.schedule import schedule_cmd
-from ptsched.find import find_cmd
-from ptsched.generate import generate_cmd
+# Each subcommand's module is imported only when that subcommand is
+# dispatched, so the heavy dependencies of one command (lark, mako,
+# multiprocessing) are not paid for by the others.
+COMMANDS = {
+    "parse": ("ptsched.parse", "parse_cmd"),
+    "schedule": ("ptsched.schedule", "schedule_cmd"),
+    "syscal": ("ptsched.syscal", "syscal_cmd"),
+    "find": ("ptsched.find", "find_cmd"),
+    "init": ("ptsched.init", "init_cmd"),
+    "generate": ("ptsched.generate", "generate_cmd"),
+    "watch": ("ptsched.watch", "watch_cmd"),
+    "check": ("ptsched.check", "check_cmd"),
+}
+
+
+def load_command(name):
+    module_name, function_name = COMMANDS[name]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def add_helper_arguments(parser: argparse.ArgumentParser):
+    """Adds the options that choose and drive event-helper."""
+    parser.add_argument(
+        "--protocol",
+        choices=("auto", "1", "2"),
+        default="auto",
+        help="The event-helper protocol to use (default: whatever the helper supports)",
+    )
+    parser.add_argument(
+        "--helper",
+        help="Command to run instead of the bundled event-helper (also read from $PTSCHED_EVENT_HELPER)",
+    )
 
 
 def main():
@@ -38,7 +65,7 @@ def main():
     parse_argument_parser = subparsers.add_parser(
         "parse", description="Parse a ptsched file and output the result"
     )
-    parse_argument_parser.set_defaults(func=parse_cmd)
+    parse_argument_parser.set_defaults(command="parse")
     parse_argument_parser.add_argument(
         "-d",
         "--dry-run",
@@ -80,38 +107,89 @@ def main():
     parse_argument_parser.add_argument(
         "filename", help="The file to read (default is STDIN)", nargs="?"
     )
+    parse_argument_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse the file even if an unchanged copy was parsed before",
+    )
+    parse_argument_parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Report parse cache hits and misses on STDERR",
+    )
 
     schedule_argument_parser = subparsers.add_parser(
         "schedule",
         description="Schedules changed .ptsched files into your calendar via syscal",
     )
-    schedule_argument_parser.set_defaults(func=schedule_cmd)
+    schedule_argument_parser.set_defaults(command="schedule")
     schedule_argument_parser.add_argument(
         "-q", "--quiet", action="store_true", help="Do not output extra information"
     )
+    schedule_argument_parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Report how long each step takes",
+    )
     schedule_argument_parser.add_argument(
         "--no-vcs", action="store_true", help="Do not commit changes to version control"
     )
+    schedule_argument_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="The number of files to process in parallel (default: the number of CPUs)",
+    )
+    schedule_argument_parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Process every file, even those unchanged since the last run",
+    )
+    schedule_argument_parser.add_argument(
+        "--no-syscal",
+        action="store_true",
+        help="Do not write the schedules to the system calendar",
+    )
+    add_helper_arguments(schedule_argument_parser)
 
     syscal_argument_parser = subparsers.add_parser(
         "syscal",
         description="Launches a helper program to write ptsched schedules to the system calendar",
     )
-    syscal_argument_parser.set_defaults(func=syscal_cmd)
+    syscal_argument_parser.set_defaults(command="syscal")
     syscal_argument_parser.add_argument("filename", help="The schedule file to use")
+    add_helper_arguments(syscal_argument_parser)
+    syscal_argument_parser.add_argument(
+        "-a",
+        "--all",
+        action="store_true",
+        help="Send every day, even those unchanged since the last sync",
+    )
+    syscal_argument_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not output extra information"
+    )
 
     find_argument_parser = subparsers.add_parser(
         "find", description="Finds the default ptsched file for new additions"
     )
-    find_argument_parser.set_defaults(func=find_cmd)
+    find_argument_parser.set_defaults(command="find")
     find_argument_parser.add_argument(
-        "-d", "--directory", help="Gives the directory instead of the file"
+        "-d",
+        "--directory",
+        action="store_true",
+        help="Gives the directory instead of the file",
+    )
+    find_argument_parser.add_argument(
+        "--date",
+        help="Finds the file for this date, as YYYY-MM-DD, instead of today",
     )
 
     init_argument_parser = subparsers.add_parser(
         "init", description="Initialize a ptsched directory"
     )
-    init_argument_parser.set_defaults(func=init_cmd)
+    init_argument_parser.set_defaults(command="init")
     init_argument_parser.add_argument(
         "-s",
         "--set-default",
@@ -119,10 +197,73 @@ def main():
         help="Sets the directory as the default ptsched directory for the user. A new ptsched directory will not be created.",
     )
 
+    watch_argument_parser = subparsers.add_parser(
+        "watch",
+        description="Watches a ptsched directory and schedules files as they change",
+    )
+    watch_argument_parser.set_defaults(command="watch")
+    watch_argument_parser.add_argument(
+        "directory",
+        nargs="?",
+        help="The directory to watch (default: the one given by find --directory)",
+    )
+    watch_argument_parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll for changes instead of using inotify",
+    )
+    watch_argument_parser.add_argument(
+        "--interval",
+        type=float,
+        help="Seconds between polls (default: 1)",
+    )
+    watch_argument_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not output extra information"
+    )
+    watch_argument_parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Report how long each step takes",
+    )
+    watch_argument_parser.add_argument(
+        "--no-vcs", action="store_true", help="Do not commit changes to version control"
+    )
+    watch_argument_parser.add_argument(
+        "--no-syscal",
+        action="store_true",
+        help="Do not write the schedules to the system calendar",
+    )
+    add_helper_arguments(watch_argument_parser)
+
+    check_argument_parser = subparsers.add_parser(
+        "check",
+        description="Checks every schedule in a directory, and the schedules against each other",
+    )
+    check_argument_parser.set_defaults(command="check")
+    check_argument_parser.add_argument(
+        "directory",
+        nargs="?",
+        help="The directory to check (default: the current directory)",
+    )
+    check_argument_parser.add_argument(
+        "--no-gaps",
+        action="store_true",
+        help="Do not warn about days between schedules that none covers",
+    )
+    check_argument_parser.add_argument(
+        "--weekend-gaps",
+        action="store_true",
+        help="Also warn about weekends between schedules that none covers",
+    )
+    check_argument_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Do not output extra information"
+    )
+
     generate_argument_parser = subparsers.add_parser(
         "generate", description="Generates a ptsched file from a template"
     )
-    generate_argument_parser.set_defaults(func=generate_cmd)
+    generate_argument_parser.set_defaults(command="generate")
     generate_argument_parser.add_argument("-o", "--outfile", help="Output file")
     generate_argument_parser.add_argument(
         "-c",
@@ -133,7 +274,7 @@ def main():
     )
 
     args = argument_parser.parse_args()
-    args.func(args)
+    load_command(args.command)(args)
 
 
 if __name__ == "__main__":
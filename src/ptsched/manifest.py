@@ -0,0 +1,148 @@
+"""Remembers what ``ptsched schedule`` last did with each schedule file.
+
+The manifest is the ``files`` list in ``.ptscheddir``. Each entry records a
+schedule file, by its path relative to the ptsched directory, with its
+modification time, size and content hash, and the same for each output it
+was rendered to. ``synced`` and ``committed`` are the content hashes the
+file had when it was last synced to the calendar and committed to git.
+
+A file is only rendered again when it or its output no longer matches its
+entry. That is decided from their stats alone, unless a stat changed; then
+the content hash decides, so that touching a file does not re-render it.
+"""
+
+import json
+import pathlib
+from typing import Dict, Optional
+
+import ptsched.utils as utils
+
+MANIFEST_NAME = ".ptscheddir"
+MANIFEST_VERSION = 1
+
+
+class DirectoryManifest:
+    def __init__(self, path: pathlib.Path, ptsched_directory: pathlib.Path, record):
+        self.path = path
+        self.ptsched_directory = ptsched_directory
+        self.record = record
+        self.files: Dict[str, dict] = {}
+        # Entries from another version of ptsched may describe other outputs.
+        if (
+            record.get("manifestVersion") == MANIFEST_VERSION
+            and record.get("ptschedVersion") == utils.ptsched_version()
+        ):
+            try:
+                self.files = {entry["path"]: entry for entry in record["files"]}
+            except (KeyError, TypeError):
+                pass
+
+    @classmethod
+    def for_directory(cls, path) -> Optional["DirectoryManifest"]:
+        """Loads the manifest of the ptsched directory containing ``path``, or
+        returns None if it is not in one."""
+        ptsched_directory = utils.find_ptsched_directory(path)
+        if ptsched_directory is None:
+            return None
+        return cls.load(ptsched_directory)
+
+    @classmethod
+    def load(cls, ptsched_directory: pathlib.Path) -> "DirectoryManifest":
+        path = ptsched_directory / MANIFEST_NAME
+        try:
+            with open(path) as manifest_file:
+                record = json.load(manifest_file)
+        except (FileNotFoundError, ValueError):
+            record = {}
+        if not isinstance(record, dict):
+            record = {}
+        return cls(path, ptsched_directory, record)
+
+    def key(self, filename) -> str:
+        return (
+            pathlib.Path(filename)
+            .absolute()
+            .relative_to(self.ptsched_directory)
+            .as_posix()
+        )
+
+    def is_current(self, input_file: str, output_file: str) -> bool:
+        """Returns whether ``input_file`` was rendered to ``output_file`` and
+        neither has changed since."""
+        entry = self.files.get(self.key(input_file))
+        if entry is None:
+            return False
+        output = entry.get("outputs", {}).get(self.key(output_file))
+        return (
+            output is not None
+            and self._matches(entry, input_file)
+            and self._matches(output, output_file)
+        )
+
+    def _matches(self, recorded: dict, filename: str) -> bool:
+        state = utils.file_state(filename)
+        if state is None:
+            return False
+        if all(recorded.get(key) == value for key, value in state.items()):
+            return True
+        if state["size"] != recorded.get("size"):
+            return False
+        if utils.file_hash(filename) != recorded.get("sha256"):
+            return False
+        recorded.update(state)
+        return True
+
+    def record_output(
+        self, input_file: str, output_file: str, input_state: Dict[str, int]
+    ):
+        """Records that ``input_file`` was rendered to ``output_file``.
+
+        ``input_state`` is the input's state from before it was read; if the
+        input changed since, nothing is recorded and it is rendered again next
+        time.
+        """
+        sha256 = utils.file_hash(input_file)
+        if utils.file_state(input_file) != input_state:
+            return
+        previous = self.files.get(self.key(input_file), {})
+        entry = {"path": self.key(input_file), **input_state, "sha256": sha256}
+        for step in ("synced", "committed"):
+            if previous.get(step) == sha256:
+                entry[step] = sha256
+        entry["outputs"] = {
+            self.key(output_file): {
+                **utils.file_state(output_file),
+                "sha256": utils.file_hash(output_file),
+            }
+        }
+        self.files[entry["path"]] = entry
+
+    def needs_sync(self, input_file: str) -> bool:
+        entry = self.files.get(self.key(input_file))
+        return entry is None or entry.get("synced") != entry.get("sha256")
+
+    def record_sync(self, input_file: str):
+        entry = self.files.get(self.key(input_file))
+        if entry is not None:
+            entry["synced"] = entry["sha256"]
+
+    def needs_commit(self, input_file: str) -> bool:
+        entry = self.files.get(self.key(input_file))
+        return entry is None or entry.get("committed") != entry.get("sha256")
+
+    def record_commit(self, input_file: str):
+        entry = self.files.get(self.key(input_file))
+        if entry is not None:
+            entry["committed"] = entry["sha256"]
+
+    def save(self):
+        """Writes the manifest, if anything in it changed, dropping the
+        entries of files that no longer exist."""
+        self.record["manifestVersion"] = MANIFEST_VERSION
+        self.record["ptschedVersion"] = utils.ptsched_version()
+        self.record["files"] = [
+            self.files[path]
+            for path in sorted(self.files)
+            if (self.ptsched_directory / path).exists()
+        ]
+        utils.write_if_changed(self.path, json.dumps(self.record))
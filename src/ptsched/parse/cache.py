@@ -0,0 +1,244 @@
+"""Caches validated schedules by the content of the file they came from.
+
+There are two tiers. A small in-process LRU serves repeated parses in one
+run. A DiskStore per ptsched directory (the one marked by ``.ptscheddir``)
+serves unchanged files across runs. Entries are keyed by a hash of the file
+contents, the grammar, the ptsched version and CACHE_VERSION, so they never
+need invalidating; old entries are evicted once the store grows past its
+size limit.
+
+The stores hold pickles, so they are kept in the user cache directory rather
+than in the ptsched directory, which is often a git checkout that others can
+write to. Each store records the ptsched directory it belongs to, and when a
+new store is created the stores of ptsched directories that no longer exist
+are removed.
+
+Only schedules that parsed and validated are cached. Cached schedules are
+shared and must be treated as read-only.
+"""
+
+import collections
+import functools
+import hashlib
+import os
+import pathlib
+import pickle
+import shutil
+import tempfile
+from typing import Optional
+
+import ptsched.parse.utils as parse_utils
+import ptsched.utils as utils
+from ptsched.structures import ScheduleTransformed
+
+# Bumped whenever the layout of ScheduleTransformed or of the cache changes.
+CACHE_VERSION = 2
+
+OWNER_FILE_NAME = "directory"
+MEMORY_ENTRIES = 128
+DISK_BYTES = 32 * 1024 * 1024
+
+
+@functools.cache
+def schema_hash() -> str:
+    """Identifies everything besides the file contents that a cached schedule
+    depends on."""
+    key = "\0".join(
+        [parse_utils.get_grammar(), utils.ptsched_version(), str(CACHE_VERSION)]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def cache_key(contents: str) -> str:
+    hash = hashlib.sha256(schema_hash().encode())
+    hash.update(contents.encode("utf-8", "surrogatepass"))
+    return hash.hexdigest()
+
+
+class DiskStore:
+    """A directory of pickled schedules, one file per key.
+
+    Reads mark an entry as recently used by updating its modification time;
+    writes evict the least recently used entries while the store is larger
+    than ``max_bytes``. ``owner`` is the ptsched directory the store belongs
+    to, if any.
+    """
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        max_bytes: int = DISK_BYTES,
+        owner: Optional[pathlib.Path] = None,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.owner = owner
+        self.evictions = 0
+        self._total_bytes: Optional[int] = None
+
+    def path(self, key: str) -> pathlib.Path:
+        return self.directory / key[:2] / f"{key}.pickle"
+
+    def get(self, key: str) -> Optional[ScheduleTransformed]:
+        path = self.path(key)
+        try:
+            with open(path, "rb") as cache_file:
+                schedule = pickle.load(cache_file)
+            os.utime(path)
+            return schedule
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # A truncated or unreadable entry is dropped and rebuilt.
+            self._remove(path)
+            return None
+
+    def put(self, key: str, schedule: ScheduleTransformed):
+        path = self.path(key)
+        try:
+            if self.owner is not None and not self.directory.exists():
+                self._create()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, prefix=".entry-", delete=False
+            ) as tmp_file:
+                pickle.dump(schedule, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file.name, path)
+        except OSError:
+            return
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._total_bytes += path.stat().st_size
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def _create(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / OWNER_FILE_NAME).write_text(str(self.owner))
+        prune_stores(self.directory.parent)
+
+    def evict(self):
+        """Removes the least recently used entries until the store fits in
+        three quarters of its limit, so that eviction is not run on every
+        write."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 3 // 4
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            self.evictions += 1
+        self._total_bytes = total
+
+    def _entries(self):
+        try:
+            subdirectories = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for subdirectory in subdirectories:
+            if not subdirectory.is_dir():
+                continue
+            for entry in os.scandir(subdirectory.path):
+                if entry.name.endswith(".pickle"):
+                    stat = entry.stat()
+                    yield pathlib.Path(entry.path), stat.st_size, stat.st_mtime
+
+    def _remove(self, path: pathlib.Path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def store_directory(ptsched_directory: pathlib.Path) -> pathlib.Path:
+    """Returns where the disk store of a ptsched directory is kept."""
+    key = hashlib.sha256(os.fsencode(ptsched_directory)).hexdigest()[:16]
+    return utils.cache_directory() / "parse" / key
+
+
+def prune_stores(directory: pathlib.Path):
+    """Removes the stores in ``directory`` whose ptsched directory no longer
+    exists."""
+    for entry in os.scandir(directory):
+        if not entry.is_dir():
+            continue
+        try:
+            owner = pathlib.Path(entry.path, OWNER_FILE_NAME).read_text()
+        except OSError:
+            owner = None
+        if owner is None or not pathlib.Path(owner, ".ptscheddir").is_file():
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class ParseCache:
+    """Looks schedules up in the in-process tier, then the on-disk tier."""
+
+    def __init__(self, memory_entries: int = MEMORY_ENTRIES):
+        self.memory_entries = memory_entries
+        self.memory = collections.OrderedDict()
+        self.stores = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def store_for(self, filename: Optional[str]) -> Optional[DiskStore]:
+        """Returns the disk store of the ptsched directory containing
+        ``filename``, if there is one."""
+        if filename is None:
+            return None
+        directory = pathlib.Path(filename).absolute().parent
+        if directory not in self.stores:
+            ptsched_directory = utils.find_ptsched_directory(directory)
+            self.stores[directory] = (
+                DiskStore(store_directory(ptsched_directory), owner=ptsched_directory)
+                if ptsched_directory is not None
+                else None
+            )
+        return self.stores[directory]
+
+    def get(self, key: str, filename: Optional[str]) -> Optional[ScheduleTransformed]:
+        schedule = self.memory.get(key)
+        if schedule is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return schedule
+
+        store = self.store_for(filename)
+        schedule = store.get(key) if store is not None else None
+        if schedule is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self._remember(key, schedule)
+        return schedule
+
+    def put(self, key: str, filename: Optional[str], schedule: ScheduleTransformed):
+        self._remember(key, schedule)
+        store = self.store_for(filename)
+        if store is not None:
+            store.put(key, schedule)
+
+    def _remember(self, key: str, schedule: ScheduleTransformed):
+        self.memory[key] = schedule
+        if len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def stats(self) -> str:
+        evictions = sum(
+            store.evictions for store in self.stores.values() if store is not None
+        )
+        return (
+            f"parse cache: {self.memory_hits} memory hits, {self.disk_hits} disk "
+            f"hits, {self.misses} misses, {evictions} evictions"
+        )
+
+
+@functools.cache
+def get_parse_cache() -> ParseCache:
+    """Returns the parse cache shared by everything in this process."""
+    return ParseCache()
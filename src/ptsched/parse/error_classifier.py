@@ -0,0 +1,446 @@
+"""Classification of parse errors against a catalogue of malformed examples.
+
+``UnexpectedInput.match_examples`` reparses every example each time it is
+called. ErrorClassifier parses the catalogue once, records the parser state
+and token each example fails on, and then answers the same question with
+dictionary lookups. Parser state numbers are only meaningful for the parser
+that produced them, so a classifier is stored alongside that parser's tables
+(see ``ptsched.parse.parser``).
+"""
+
+import hashlib
+from typing import Callable, Iterable, Mapping, Optional, Tuple
+
+from lark.exceptions import UnexpectedEOF, UnexpectedInput, UnexpectedToken
+
+# Bumped whenever the classifier's pickled layout changes.
+CLASSIFIER_VERSION = 1
+
+ERROR_EXAMPLES = {
+    "No metadata": [
+        """
+# Class A
+
+- Tue 20
+"""
+    ],
+    "Missing dash in metadata": [
+        """1 January 2024 31 January 2024
+
+# Class A
+
+- Tue 20
+""",
+        """15 Feb 2024 20 Feb 2024
+
+# Class A
+
+- Wed 21
+""",
+    ],
+    "Invalid date format in metadata": [
+        """January 1 2024 - February 1 2024
+
+# Class A
+
+- Tue 20
+""",
+        """1/1/2024 - 2/1/2024
+
+# Class A
+
+- Tue 20
+""",
+        """32 January 2024 - 1 February 2024
+
+# Class A
+
+- Tue 20
+""",
+    ],
+    "Invalid month name": [
+        """1 Janvier 2024 - 1 February 2024
+
+# Class A
+
+- Tue 20
+""",
+        """1 Janaury 2024 - 1 February 2024
+
+# Class A
+
+- Tue 20
+""",
+    ],
+    "Invalid year format": [
+        """1 January 24 - 1 February 2024
+
+# Class A
+
+- Tue 20
+""",
+        """1 January 202 - 1 February 2024
+
+# Class A
+
+- Tue 20
+""",
+    ],
+    "Missing class declaration hash": [
+        """1 January 2024 - 31 January 2024
+
+Class A
+
+- Tue 20
+""",
+        """1 January 2024 - 31 January 2024
+
+ Class A
+
+- Tue 20
+""",
+    ],
+    "Missing class name": [
+        """1 January 2024 - 31 January 2024
+
+#
+
+- Tue 20
+""",
+        """1 January 2024 - 31 January 2024
+
+#
+
+- Tue 20
+""",
+    ],
+    "Missing day declaration dash": [
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+Tue 20
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+ Tue 20
+""",
+    ],
+    "Invalid day of week": [
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Tues 20
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Tuesday 32
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Wenesday 20
+""",
+    ],
+    "Invalid day of month": [
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Tue 32
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Wed 0
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Thu 100
+""",
+    ],
+    "Class with no days": [
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+# Class B
+
+- Wed 21
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+""",
+    ],
+    "Task starting with forbidden characters": [
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Tue 20
+    - This is not allowed
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Wed 21
+    # This is not allowed either
+""",
+    ],
+    "Missing day of month in date declaration": [
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Tuesday
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Fri
+""",
+    ],
+    "Incomplete metadata dates": [
+        """1 January - 31 January 2024
+
+# Class A
+
+- Tue 20
+""",
+        """January 2024 - February 2024
+
+# Class A
+
+- Wed 21
+""",
+        """2024 - 2024
+
+# Class A
+
+- Thu 22
+""",
+    ],
+    "Empty schedule": ["", "   ", "\n\n\n"],
+    "Only metadata, no body": [
+        """1 January 2024 - 31 January 2024""",
+        """15 Feb 2024 - 20 Feb 2024
+
+""",
+    ],
+    "Day with malformed tasks": [
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Tue 20
+    Task 1
+    Task 2
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- Wed 21
+Task without proper indentation
+""",
+    ],
+    "Multiple consecutive dashes": [
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+-- Tue 20
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A
+
+- - Wed 21
+""",
+    ],
+    "Multiple consecutive hashes": [
+        """1 January 2024 - 31 January 2024
+
+## Class A
+
+- Tue 20
+""",
+        """1 January 2024 - 31 January 2024
+
+# # Class A
+
+- Wed 21
+""",
+    ],
+    "Invalid whitespace in metadata": [
+        """1  January  2024  -  31  January  2024
+
+# Class A
+
+- Tue 20
+""",
+        """1	January	2024	-	31	January	2024
+
+# Class A
+
+- Wed 21
+""",
+    ],
+    "Metadata on wrong line": [
+        """
+1 January 2024 - 31 January 2024
+# Class A
+
+- Tue 20
+""",
+        """# Class A
+1 January 2024 - 31 January 2024
+
+- Wed 21
+""",
+    ],
+    "Mixed date formats": [
+        """1 Jan 2024 - 31 January 2024
+
+# Class A
+
+- Tue 20
+""",
+        """1 January 2024 - 31 Feb 2024
+
+# Class A
+
+- Wed 21
+""",
+    ],
+    "Missing required newlines": [
+        """1 January 2024 - 31 January 2024# Class A
+- Tue 20
+""",
+        """1 January 2024 - 31 January 2024
+
+# Class A- Wed 21
+""",
+    ],
+}
+
+
+def catalogue_hash() -> str:
+    """Identifies the catalogue and classifier layout a cached classifier was
+    built from."""
+    key = "%d\0%r" % (CLASSIFIER_VERSION, ERROR_EXAMPLES)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _state_key(error: UnexpectedInput):
+    # ParserState compares equal on stack depth and LALR position.
+    state = error.state
+    return len(state.state_stack), state.position
+
+
+def _accepts(error: UnexpectedInput):
+    if isinstance(error, UnexpectedToken):
+        return frozenset(error.accepts)
+    return None
+
+
+def _token_key(error: UnexpectedInput):
+    if isinstance(error, (UnexpectedToken, UnexpectedEOF)):
+        return error.token.type, str(error.token)
+    return None
+
+
+def _first(*entries):
+    return min((entry for entry in entries if entry is not None), default=None)
+
+
+class ErrorClassifier:
+    """Maps a parse error to the label ``error.match_examples(parse, examples)``
+    would return for it, with ``use_accepts=True``.
+
+    Every table maps a key to the first ``(index, label)`` pair, in catalogue
+    order, whose example failed with that key.
+    """
+
+    def __init__(self):
+        # (state, accepts or None, token type, token value)
+        self.exact = {}
+        # (state, token type, token value), ignoring accepts
+        self.exact_any = {}
+        # (state, accepts) for examples failing with UnexpectedToken
+        self.by_accepts = {}
+        # state, for examples failing any other way
+        self.by_state_other = {}
+        # state, for every example
+        self.by_state = {}
+
+    @classmethod
+    def from_examples(
+        cls,
+        parse_fn: Callable[[str], object],
+        examples: Mapping[str, Iterable[str]] = ERROR_EXAMPLES,
+    ) -> "ErrorClassifier":
+        classifier = cls()
+        index = 0
+        for label, malformed_examples in examples.items():
+            for malformed in malformed_examples:
+                try:
+                    parse_fn(malformed)
+                except UnexpectedInput as error:
+                    if error.state is not None:
+                        classifier.add(index, label, error)
+                index += 1
+        return classifier
+
+    def add(self, index: int, label: str, error: UnexpectedInput):
+        entry = (index, label)
+        state = _state_key(error)
+        accepts = _accepts(error)
+        token = _token_key(error)
+
+        self.by_state.setdefault(state, entry)
+        if accepts is None:
+            self.by_state_other.setdefault(state, entry)
+        else:
+            self.by_accepts.setdefault((state, accepts), entry)
+
+        if token is not None:
+            self.exact.setdefault((state, accepts) + token, entry)
+            self.exact_any.setdefault((state,) + token, entry)
+
+    def classify(self, error: UnexpectedInput) -> Optional[str]:
+        if error.state is None:
+            return None
+
+        state = _state_key(error)
+        token = _token_key(error)
+        match: Optional[Tuple[int, str]]
+        if isinstance(error, UnexpectedToken):
+            # Examples with a different set of acceptable tokens never match.
+            accepts = _accepts(error)
+            match = _first(
+                self.exact.get((state, accepts) + token),
+                self.exact.get((state, None) + token),
+            ) or _first(
+                self.by_accepts.get((state, accepts)),
+                self.by_state_other.get(state),
+            )
+        else:
+            match = None
+            if token is not None:
+                match = self.exact_any.get((state,) + token)
+            match = match or self.by_state.get(state)
+
+        return match[1] if match else None
@@ -1,41 +1,59 @@
-from mako.template import Template
-from ptsched.structures import ScheduleTransformed
-
-
-def render_default(schedule: ScheduleTransformed):
-    result = []
-    template = Template("""% for _class in day.classes:
-${_class.name + ":"}
-        % for task in _class.tasks:
-${task.name}
-        % endfor
-        % if not loop.last:
-
-        % endif
-    % endfor""")
-    for day in schedule.days:
-        result.append({"date": day.date, "content": template.render(day=day)})
-
-    return result
-
-
-def render_markdown(schedule: ScheduleTransformed):
-    result = []
-    template = Template("""# Tasks: ${day.date}
-
-    % for _class in day.classes:
-${"##"} ${_class.name}
-        % if _class.tasks:
-
-        % endif
-        % for task in _class.tasks:
-- [ ] ${task.name}
-        % endfor
-        % if not loop.last:
-
-        % endif
-    % endfor""")
-    for day in schedule.days:
-        result.append({"date": day.date, "content": template.render(day=day)})
-
-    return result
+from typing import Iterator, TextIO
+
+from ptsched.structures import DayTransformed, ScheduleTransformed
+
+
+def iter_default(schedule: ScheduleTransformed) -> Iterator[str]:
+    """Yields the normal output format piece by piece: each day as the
+    default template renders it, after a blank line and a date heading."""
+    for index, day in enumerate(schedule.days):
+        if index > 0:
+            yield "\n"
+        yield str(day.date)
+        yield ":\n\n"
+        yield from iter_default_day(day)
+
+
+def iter_default_day(day: DayTransformed) -> Iterator[str]:
+    """Yields the content of one day in the normal output format."""
+    last_class = len(day.classes) - 1
+    for class_index, class_ in enumerate(day.classes):
+        yield class_.name
+        yield ":\n"
+        for task in class_.tasks:
+            yield task.name
+            yield "\n"
+        if class_index != last_class:
+            yield "\n"
+
+
+def iter_markdown(schedule: ScheduleTransformed) -> Iterator[str]:
+    """Yields the markdown output format piece by piece: each day as the
+    markdown template renders it, with a blank line between days."""
+    for index, day in enumerate(schedule.days):
+        if index > 0:
+            yield "\n"
+        yield "# Tasks: "
+        yield str(day.date)
+        yield "\n\n"
+        last_class = len(day.classes) - 1
+        for class_index, class_ in enumerate(day.classes):
+            yield "## "
+            yield class_.name
+            yield "\n"
+            if class_.tasks:
+                yield "\n"
+            for task in class_.tasks:
+                yield "- [ ] "
+                yield task.name
+                yield "\n"
+            if class_index != last_class:
+                yield "\n"
+
+
+def write_default(schedule: ScheduleTransformed, outfile: TextIO):
+    outfile.writelines(iter_default(schedule))
+
+
+def write_markdown(schedule: ScheduleTransformed, outfile: TextIO):
+    outfile.writelines(iter_markdown(schedule))
@@ -1,10 +1,15 @@
+import io
 import sys
 import json
+from typing import Optional
 
 import ptsched.parse.outputs as outputs
+import ptsched.utils as utils
+from ptsched.parse.cache import ParseCache, cache_key, get_parse_cache
 from ptsched.parse.transformer import ScheduleTransformer
 from ptsched.parse.validate import validate_schedule, ValidationErrors
-from ptsched.parse.parser import ptsched_parser
+from ptsched.parse.parser import get_parser
+from ptsched.parse.scanner import ScanError, scan_schedule
 from ptsched.parse.error_handling import lark_error_handler
 from lark.exceptions import UnexpectedInput
 
@@ -13,7 +18,13 @@ def parse_str(contents, filename):
     result = {}
     result["courses"] = {}
 
-    initial_pass = ptsched_parser.parse(contents)
+    try:
+        return scan_schedule(contents)
+    except ScanError:
+        # Let the full parser accept the input or explain what is wrong.
+        pass
+
+    initial_pass = get_parser().parse(contents)
 
     transformed_pass = ScheduleTransformer().transform(initial_pass)
 
@@ -22,12 +33,26 @@ def parse_str(contents, filename):
     return validated_pass
 
 
+def parse_str_cached(contents, filename, cache: Optional[ParseCache] = None):
+    """Like parse_str, but reuses the result of an earlier parse of the same
+    contents from ``cache``, by default the process's parse cache."""
+    if cache is None:
+        cache = get_parse_cache()
+    key = cache_key(contents)
+    schedule = cache.get(key, filename)
+    if schedule is None:
+        schedule = parse_str(contents, filename)
+        cache.put(key, filename, schedule)
+    return schedule
+
+
 def parse_cmd(arguments):
     parse(**vars(arguments))
 
 
-def parse(**kwargs):
-    filename = kwargs.get("filename")
+def read_schedule(filename: Optional[str], use_cache: bool = True):
+    """Parses the named file (or STDIN), printing any errors and exiting if it
+    cannot be read or is not a valid schedule."""
     if filename is not None:
         try:
             infile = open(filename)
@@ -40,7 +65,9 @@ def parse(**kwargs):
     file_contents = infile.read()
 
     try:
-        schedule = parse_str(file_contents, filename)
+        if use_cache:
+            return parse_str_cached(file_contents, filename)
+        return parse_str(file_contents, filename)
     except UnexpectedInput as e:
         print(lark_error_handler(e, file_contents, infile.name), file=sys.stderr)
         exit(1)
@@ -51,16 +78,31 @@ def parse(**kwargs):
         if infile != sys.stdin:
             infile.close()
 
+
+def parse(**kwargs):
+    schedule = read_schedule(kwargs.get("filename"), not kwargs.get("no_cache"))
+
+    if kwargs.get("cache_stats"):
+        print(get_parse_cache().stats(), file=sys.stderr)
+
     output_filename = kwargs.get("output")
-    if output_filename is not None:
-        try:
-            outfile = open(output_filename, mode="w")
-        except OSError as error:
-            print("Error when opening file:", error, file=sys.stderr)
-            exit(1)
-    else:
-        outfile = sys.stdout
+    if output_filename is None:
+        write_output(schedule, sys.stdout, **kwargs)
+        return
+
+    # Output files are only replaced when their contents change.
+    output = io.StringIO()
+    write_output(schedule, output, **kwargs)
+    if kwargs.get("dry_run"):
+        return
+    try:
+        utils.write_if_changed(output_filename, output.getvalue())
+    except OSError as error:
+        print("Error when writing file:", error, file=sys.stderr)
+        exit(1)
+
 
+def write_output(schedule, outfile, **kwargs):
     if kwargs.get("list_courses"):
         for course in schedule["courses"]:
             print(course, file=outfile)
@@ -79,14 +121,8 @@ def parse(**kwargs):
         return
 
     if kwargs.get("markdown"):
-        for idx, day in enumerate(outputs.render_markdown(schedule)):
-            print(("\n" if idx > 0 else "") + day["content"], file=outfile, end="")
+        outputs.write_markdown(schedule, outfile)
         return
     elif kwargs.get("normal"):
-        for idx, day in enumerate(outputs.render_default(schedule)):
-            print(
-                ("\n" if idx > 0 else "") + day["date"] + ":\n\n" + day["content"],
-                file=outfile,
-                end="",
-            )
+        outputs.write_default(schedule, outfile)
         return
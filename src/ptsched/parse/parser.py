@@ -1,6 +1,102 @@
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+from typing import Tuple
+
 import ptsched.parse.utils as parse_utils
-from lark import Lark
+import ptsched.utils as utils
+from lark import Lark, Token, __version__ as lark_version
+from ptsched.parse.error_classifier import ErrorClassifier, catalogue_hash
+
+
+class EndOfInput:
+    """Terminates a final line that has no trailing newline.
+
+    The grammar ends every line with a line terminator so that it stays
+    LALR(1); a file whose last line runs into the end of input gets a
+    synthetic ``_EOF`` token instead.
+    """
+
+    always_accept = ()
+
+    def process(self, stream):
+        last_token = None
+        for token in stream:
+            yield token
+            last_token = token
+
+        if last_token is None or last_token.type != "_NL":
+            # Mirror UnexpectedEOF, which reports no position.
+            yield Token("_EOF", "", line=-1, column=-1)
+
+
+def build_parser() -> Lark:
+    """Compiles the grammar into a new parser."""
+    return Lark(
+        parse_utils.get_grammar(),
+        start="schedule",
+        parser="lalr",
+        lexer="contextual",
+        postlex=EndOfInput(),
+        propagate_positions=True,
+    )
+
+
+def grammar_hash() -> str:
+    """Identifies the grammar together with everything its tables depend on."""
+    key = "\0".join(
+        [parse_utils.get_grammar(), lark_version, "%d.%d" % sys.version_info[:2]]
+    )
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def parser_cache_path():
+    return utils.cache_directory() / f"parser-{grammar_hash()}-{catalogue_hash()}.lark"
+
+
+@functools.cache
+def load_parser() -> Tuple[Lark, ErrorClassifier]:
+    """Returns the schedule parser and its error classifier, loading both from
+    the user cache directory when possible and building (and caching) them
+    otherwise.
+
+    The classifier is keyed by parser state numbers, which differ between
+    builds of the same grammar, so the two are always stored and loaded
+    together.
+    """
+    cache_path = parser_cache_path()
+    try:
+        with open(cache_path, "rb") as cache_file:
+            parser = Lark.load(cache_file)
+            classifier = pickle.load(cache_file)
+        return parser, classifier
+    except Exception:
+        # A missing, truncated or stale cache entry is rebuilt below.
+        pass
+
+    parser = build_parser()
+    classifier = ErrorClassifier.from_examples(parser.parse)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=cache_path.parent, prefix=".parser-", delete=False
+        ) as tmp_file:
+            parser.save(tmp_file)
+            pickle.dump(classifier, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file.name, cache_path)
+    except OSError:
+        # The cache is an optimization; an unwritable directory is not fatal.
+        pass
+
+    return parser, classifier
+
+
+def get_parser() -> Lark:
+    return load_parser()[0]
+
 
-ptsched_parser = Lark(
-    parse_utils.get_grammar(), start="schedule", propagate_positions=True
-)
+def get_error_classifier() -> ErrorClassifier:
+    return load_parser()[1]
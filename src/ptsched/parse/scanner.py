@@ -0,0 +1,121 @@
+"""A single-pass line scanner for well-formed schedules.
+
+The ptsched format is line based, so a valid file can be turned into a
+ScheduleTransformed without building a parse tree. The scanner accepts a
+subset of what the grammar in ``data/ptsched.lark`` accepts and produces the
+same result for it. Anything it is unsure about, including every syntax or
+validation error, raises ScanError; the caller then runs the Lark parser,
+which produces the diagnostics.
+"""
+
+import datetime
+import re
+
+from ptsched.parse.validate import ScheduleBuilder, resolve_date
+from ptsched.structures import ScheduleTransformed
+from ptsched.utils import METADATA, MONTHS, alternatives_pattern, get_dates
+
+WEEKDAYS = {
+    "Monday": 0,
+    "Mon": 0,
+    "Tuesday": 1,
+    "Tue": 1,
+    "Wednesday": 2,
+    "Wed": 2,
+    "Thursday": 3,
+    "Thu": 3,
+    "Friday": 4,
+    "Fri": 4,
+    "Saturday": 5,
+    "Sat": 5,
+    "Sunday": 6,
+    "Sun": 6,
+}
+
+
+# Whitespace the grammar's _NL terminal consumes around a line break.
+LINE_SPACE = " \t\f\r"
+
+CLASS_DECLARATION = re.compile(r"#[ \t]+")
+DATE_DECLARATION = re.compile(
+    r"-[ \t]+(%s)[ \t]+([0-9]{1,2})([ \t\f\r]*)" % alternatives_pattern(WEEKDAYS)
+)
+
+
+class ScanError(Exception):
+    """Raised when the scanner cannot handle the input."""
+
+
+def scan_schedule(contents: str) -> ScheduleTransformed:
+    lines = contents.lstrip(LINE_SPACE + "\n").split("\n")
+
+    metadata = METADATA.fullmatch(lines[0])
+    if metadata is None or len(lines) == 1:
+        raise ScanError("metadata")
+
+    try:
+        start_date = datetime.date(
+            int(metadata[3]), MONTHS[metadata[2]], int(metadata[1])
+        )
+        end_date = datetime.date(
+            int(metadata[6]), MONTHS[metadata[5]], int(metadata[4])
+        )
+    except ValueError:
+        raise ScanError("metadata date")
+    if start_date > end_date:
+        raise ScanError("date range")
+
+    classes = []
+    class_names = set()
+    tasks = None
+    for index in range(1, len(lines)):
+        line = lines[index].lstrip(LINE_SPACE)
+        if not line:
+            continue
+
+        first = line[0]
+        if first == "#":
+            declaration = CLASS_DECLARATION.match(line)
+            if declaration is None or declaration.end() == len(line):
+                raise ScanError("class declaration")
+            if classes and not classes[-1][1]:
+                raise ScanError("class without days")
+            class_name = line[declaration.end() :]
+            if class_name in class_names:
+                raise ScanError("duplicate class")
+            class_names.add(class_name)
+            classes.append((class_name, []))
+            tasks = None
+        elif first == "-":
+            declaration = DATE_DECLARATION.fullmatch(line)
+            if declaration is None or not classes:
+                raise ScanError("date declaration")
+            if declaration[3].strip(" \t") and index == len(lines) - 1:
+                # Only a line break may follow \f or \r.
+                raise ScanError("date declaration")
+            try:
+                day_date = resolve_date(int(declaration[2]), start_date, end_date)
+            except ValueError:
+                raise ScanError("date")
+            if day_date.weekday() != WEEKDAYS[declaration[1]]:
+                raise ScanError("weekday")
+            tasks = []
+            classes[-1][1].append((day_date, tasks))
+        elif tasks is None or first.isspace():
+            raise ScanError("task")
+        else:
+            tasks.append(line)
+
+    if classes and not classes[-1][1]:
+        raise ScanError("class without days")
+
+    required_days = get_dates(start_date, end_date)
+    builder = ScheduleBuilder(ScheduleTransformed.Metadata(start_date, end_date))
+    for class_name, days in classes:
+        class_days = {day_date for day_date, _ in days}
+        if len(class_days) != len(days) or class_days != required_days:
+            raise ScanError("days")
+        for day_date, task_names in days:
+            builder.add_class_day(day_date, class_name, task_names)
+
+    return builder.build()
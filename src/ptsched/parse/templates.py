@@ -0,0 +1,43 @@
+"""Loads the Mako templates in ``data/templates``.
+
+Each template is compiled once per process. Mako's generated Python module
+is also kept in the user cache directory, so later processes import it
+instead of lexing and compiling the template again.
+"""
+
+import functools
+import hashlib
+import importlib.resources
+
+import ptsched.utils as utils
+from mako import __version__ as mako_version
+from mako.template import Template
+
+
+def template_cache_directory():
+    return utils.cache_directory() / "templates"
+
+
+def template_key(name: str, source: str) -> str:
+    """Identifies a template's source together with the versions its
+    compiled module depends on."""
+    key = "\0".join([name, source, utils.ptsched_version(), mako_version])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+@functools.cache
+def get_template(name: str) -> Template:
+    """Returns the compiled template ``data/templates/<name>.mako``."""
+    resource = importlib.resources.files("ptsched") / "data" / "templates"
+    resource = resource / f"{name}.mako"
+    with importlib.resources.as_file(resource) as filename:
+        source = resource.read_text(encoding="utf-8")
+        try:
+            return Template(
+                filename=str(filename),
+                uri=f"{name}-{template_key(name, source)}.mako",
+                module_directory=str(template_cache_directory()),
+                input_encoding="utf-8",
+            )
+        except OSError:
+            return Template(source)
@@ -1,5 +1,6 @@
 import importlib.resources
-from typing import Optional
+import itertools
+from typing import List, Optional, Union
 
 TERMINAL_RED = "\033[31m"
 TERMINAL_RESET = "\033[0m"
@@ -11,32 +12,58 @@ def get_grammar() -> str:
     )
 
 
+class LineIndex:
+    """The offsets at which each line of a file starts.
+
+    Built once per file so that any number of diagnostics can look up their
+    source line without splitting the whole file again. Lines are split as
+    str.splitlines() splits them.
+    """
+
+    def __init__(self, file_contents: str):
+        self.file_contents = file_contents
+        self.line_starts: List[int] = [0]
+        self.line_starts.extend(
+            itertools.accumulate(map(len, file_contents.splitlines(keepends=True)))
+        )
+
+    def __len__(self):
+        return len(self.line_starts) - 1
+
+    def line(self, lineno: int) -> str:
+        """Returns the text of a 1-based line, without its line break."""
+        text = self.file_contents[
+            self.line_starts[lineno - 1] : self.line_starts[lineno]
+        ]
+        return text.splitlines()[0] if text else text
+
+
 def display_error_line(
     message: str,
     lineno: int,
     colno: int,
-    file_contents: str,
+    file_contents: Union[str, LineIndex],
     filename: str,
     endcolno: Optional[int] = None,
+    severity: str = "Error",
 ) -> str:
-    lines = file_contents.splitlines()
+    if isinstance(file_contents, str):
+        file_contents = LineIndex(file_contents)
 
     # Get column position (meta.column is 1-based)
     col_start = colno
     col_end = endcolno or col_start + 1
 
     # Ensure we have valid line numbers
-    if lineno < 1 or lineno > len(lines):
-        return f"Error: {message}"
+    if lineno < 1 or lineno > len(file_contents):
+        return f"{severity}: {message}"
 
-    # Get the problematic line (convert to 0-based index)
-    error_line = lines[lineno - 1]
+    # Get the problematic line
+    error_line = file_contents.line(lineno)
 
     # Print the error message
     result = ""
-    result += (
-        f"{TERMINAL_RED}Error at {filename}:{lineno} - {message}{TERMINAL_RESET}\n\n"
-    )
+    result += f"{TERMINAL_RED}{severity} at {filename}:{lineno} - {message}{TERMINAL_RESET}\n\n"
 
     # Print the line with line number
     result += f"{lineno:4d} | {error_line}\n"
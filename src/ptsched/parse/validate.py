@@ -1,8 +1,8 @@
 import datetime
 import sys
 from ptsched.utils import get_dates
-from ptsched.parse.utils import display_error
-from typing import List
+from ptsched.parse.utils import LineIndex, display_error_line
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from ptsched.structures import (
     Task,
     ScheduleTransformed,
@@ -22,17 +22,44 @@ WEEKDAYS = [
 
 
 class ValidationError(Exception):
-    def __init__(self, message: str, meta, file_contents: str, file_name: str):
-        self.message = display_error(message, meta, file_contents, file_name)
+    """A problem with a schedule, located by a span on one line.
+
+    Only the position is kept; the source line is looked up when the error
+    is formatted.
+    """
+
+    def __init__(self, message: str, meta):
+        super().__init__(message)
+        self.message = message
+        self.line = meta.line
+        self.column = meta.column
+        self.end_column = meta.end_column
+
+    def format(self, line_index: LineIndex, file_name: str) -> str:
+        return display_error_line(
+            self.message,
+            self.line,
+            self.column,
+            line_index,
+            file_name,
+            self.end_column,
+        )
 
 
 class ValidationErrors(Exception):
-    def __init__(self, errors):
+    def __init__(self, errors: List[ValidationError], file_contents: str, file_name):
         self.errors = errors
+        self.file_contents = file_contents
+        self.file_name = file_name
 
-    def display_errors(self):
+    def format_errors(self) -> Iterator[str]:
+        line_index = LineIndex(self.file_contents)
         for error in self.errors:
-            print(error.message, file=sys.stderr)
+            yield error.format(line_index, self.file_name)
+
+    def display_errors(self):
+        for message in self.format_errors():
+            print(message, file=sys.stderr)
 
 
 def validate_schedule(schedule, file_contents: str, file_name: str):
@@ -46,7 +73,14 @@ def validate_schedule(schedule, file_contents: str, file_name: str):
     start_month = start_date_info["month"]["month"]
     start_day = start_date_info["day"]["day_of_month"]
 
-    start_date = datetime.date(start_year, start_month, start_day)
+    start_date = metadata_date(
+        start_year,
+        start_month,
+        start_day,
+        metadata["start_date"],
+        file_contents,
+        file_name,
+    )
 
     end_date_info = metadata["end_date"]["date_info"]
 
@@ -54,7 +88,9 @@ def validate_schedule(schedule, file_contents: str, file_name: str):
     end_month = end_date_info["month"]["month"]
     end_day = end_date_info["day"]["day_of_month"]
 
-    end_date = datetime.date(end_year, end_month, end_day)
+    end_date = metadata_date(
+        end_year, end_month, end_day, metadata["end_date"], file_contents, file_name
+    )
 
     if start_date > end_date:
         # Fatal error, so raise immediately
@@ -63,13 +99,13 @@ def validate_schedule(schedule, file_contents: str, file_name: str):
                 ValidationError(
                     "End date cannot be before start date",
                     metadata["end_date"]["meta"],
-                    file_contents,
-                    file_name,
                 )
-            ]
+            ],
+            file_contents,
+            file_name,
         )
 
-    result = ScheduleTransformed(ScheduleTransformed.Metadata(start_date, end_date), [])
+    builder = ScheduleBuilder(ScheduleTransformed.Metadata(start_date, end_date))
     existing_class_names = set()
     required_days = get_dates(start_date, end_date)
     for class_ in schedule["classes"]:
@@ -80,8 +116,6 @@ def validate_schedule(schedule, file_contents: str, file_name: str):
                 ValidationError(
                     f'Duplicate class declarations: "{class_name}"',
                     class_["name"]["meta"],
-                    file_contents,
-                    file_name,
                 )
             )
         existing_class_names.add(class_name)
@@ -96,68 +130,94 @@ def validate_schedule(schedule, file_contents: str, file_name: str):
                 start_date,
                 end_date,
                 day["date_specifier"]["meta"],
-                file_contents,
-                file_name,
                 errors,
             )
+            if day_date is None:
+                continue
 
             if day_date in existing_class_days:
                 errors.append(
                     ValidationError(
                         f'Duplicate class days: "{day_date.isoformat()}"',
                         day["date_specifier"]["meta"],
-                        file_contents,
-                        file_name,
                     )
                 )
             existing_class_days.add(day_date)
 
-            transformed_day = next(
-                (x for x in result.days if (x.date) == day_date.isoformat()), None
-            )
-
-            if transformed_day is None:
-                transformed_day = DayTransformed(date=day_date.isoformat(), classes=[])
-                result.days.append(transformed_day)
-
-            transformed_class = next(
-                (x for x in transformed_day.classes if x.name == class_name), None
+            builder.add_class_day(
+                day_date, class_name, (task["task"] for task in day["tasks"])
             )
 
-            if transformed_class is None:
-                transformed_class = SchoolClassTransformed(name=class_name, tasks=[])
-                transformed_day.classes.append(transformed_class)
-
-            for task in day["tasks"]:
-                transformed_class.tasks.append(Task(name=task["task"]))
-
         missing_days = required_days - existing_class_days
         if missing_days:
             errors.append(
                 ValidationError(
                     f"{class_name} is missing {', '.join(sorted((x.isoformat() for x in missing_days)))}",
                     class_["name"]["meta"],
-                    file_contents,
-                    file_name,
                 )
             )
 
     if errors:
-        raise ValidationErrors(errors)
+        raise ValidationErrors(errors, file_contents, file_name)
 
-    return result
+    return builder.build()
 
 
-def parse_date(
-    weekday: int,
-    day_number: int,
-    range_start: datetime.date,
-    range_end: datetime.date,
-    meta,
-    file_contents: str,
-    file_name: str,
-    errors: List[ValidationError],
-):
+class ScheduleBuilder:
+    """Collects the tasks of each class on each day into a ScheduleTransformed.
+
+    Days are indexed by date ordinal and classes by name within a day, so
+    adding a class day takes constant time however large the schedule is.
+    """
+
+    def __init__(self, metadata: ScheduleTransformed.Metadata):
+        self.metadata = metadata
+        self.days: Dict[int, DayTransformed] = {}
+        self.classes: Dict[Tuple[int, str], SchoolClassTransformed] = {}
+
+    def add_class_day(
+        self, day_date: datetime.date, class_name: str, task_names: Iterable[str]
+    ):
+        """Adds the tasks one class has on one day to the schedule."""
+        ordinal = day_date.toordinal()
+        transformed_day = self.days.get(ordinal)
+        if transformed_day is None:
+            transformed_day = DayTransformed(date=day_date, classes=[])
+            self.days[ordinal] = transformed_day
+
+        transformed_class = self.classes.get((ordinal, class_name))
+        if transformed_class is None:
+            transformed_class = SchoolClassTransformed(name=class_name, tasks=[])
+            transformed_day.classes.append(transformed_class)
+            self.classes[ordinal, class_name] = transformed_class
+
+        transformed_class.tasks.extend(Task(name=task_name) for task_name in task_names)
+
+    def build(self) -> ScheduleTransformed:
+        """Returns the schedule, with its days in date order."""
+        return ScheduleTransformed(
+            self.metadata, [self.days[ordinal] for ordinal in sorted(self.days)]
+        )
+
+
+def metadata_date(
+    year: int, month: int, day: int, date, file_contents: str, file_name: str
+) -> datetime.date:
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        # Fatal error, so raise immediately
+        raise ValidationErrors(
+            [ValidationError("Date does not exist", date["meta"])],
+            file_contents,
+            file_name,
+        )
+
+
+def resolve_date(
+    day_number: int, range_start: datetime.date, range_end: datetime.date
+) -> datetime.date:
+    """Infers the month and year of a day declaration from the schedule range."""
     if range_start.month == range_end.month:
         month = range_start.month
     else:
@@ -168,21 +228,35 @@ def parse_date(
     else:
         year = range_start.year if day_number >= range_start.day else range_end.year
 
-    result = datetime.date(year, month, day_number)
-    if result.weekday() != weekday:
+    return datetime.date(year, month, day_number)
+
+
+def parse_date(
+    weekday: int,
+    day_number: int,
+    range_start: datetime.date,
+    range_end: datetime.date,
+    meta,
+    errors: List[ValidationError],
+) -> Optional[datetime.date]:
+    try:
+        result = resolve_date(day_number, range_start, range_end)
+    except ValueError:
         errors.append(
             ValidationError(
-                f'Day of week "{WEEKDAYS[weekday]}" does not match date "{result.isoformat()}" ({WEEKDAYS[result.weekday()]}).',
+                f"Day {day_number} does not exist in the months of the schedule range",
                 meta,
-                file_contents,
-                file_name,
             )
         )
-    if not (result >= range_start and result <= range_end):
+        return None
+    if result.weekday() != weekday:
         errors.append(
             ValidationError(
-                "Date not in schedule range", meta, file_contents, file_name
+                f'Day of week "{WEEKDAYS[weekday]}" does not match date "{result.isoformat()}" ({WEEKDAYS[result.weekday()]}).',
+                meta,
             )
         )
+    if not (result >= range_start and result <= range_end):
+        errors.append(ValidationError("Date not in schedule range", meta))
 
     return result
@@ -1,10 +1,28 @@
+import io
 import os
 
+import contextlib
 import datetime
 import multiprocessing
+import subprocess
+import sys
+import time
+from typing import List, Optional, Set, Tuple
 
 import ptsched.utils as utils
+from ptsched.parse.outputs import write_markdown
+from ptsched.parse.parse import parse_str_cached
+from ptsched.parse.validate import ValidationErrors
+from ptsched.parse.error_handling import lark_error_handler
+from ptsched.event_helper import HELPER_ENVIRONMENT_VARIABLE, helper_installed
+from ptsched.manifest import DirectoryManifest
+from ptsched.syscal import sync_files
 from ptsched.update import update_file
+from lark.exceptions import UnexpectedInput
+
+# Files handed to each worker at a time, relative to what an even split
+# between the workers would give; smaller chunks balance uneven files better.
+CHUNKS_PER_JOB = 4
 
 
 def schedule_cmd(arguments):
@@ -12,14 +30,199 @@ def schedule_cmd(arguments):
 
 
 def schedule(**kwargs):
-    file_pairs = utils.find_file_pairs()
+    root = os.getcwd()
+    # Directories unchanged since the last run are not listed again.
+    index = utils.ScanIndex.for_directory(root)
+    file_pairs = utils.find_file_pairs(root, index)
+    if index is not None:
+        try:
+            index.save()
+        except OSError:
+            pass
+
+    failed = schedule_pairs(file_pairs, **kwargs)
+    if failed:
+        exit(1)
+
+
+def schedule_pairs(file_pairs: List[Tuple[str, str]], **kwargs) -> Set[str]:
+    """Runs the schedule pipeline (render, syscal and vcs) over the given
+    input and output files, and returns the input files that failed.
 
-    with multiprocessing.Pool(5) as pool:
-        pool.map(update_file, file_pairs)
+    Files whose input and output are unchanged since the last run are
+    skipped.
+    """
+    manifest = DirectoryManifest.for_directory(os.getcwd())
+    if manifest is not None and not kwargs.get("force"):
+        stale_pairs = [pair for pair in file_pairs if not manifest.is_current(*pair)]
+    else:
+        stale_pairs = file_pairs
+    stale_files = {input_file for input_file, _ in stale_pairs}
+    input_states = {
+        input_file: utils.file_state(input_file) for input_file, _ in stale_pairs
+    }
+
+    failed = set()
+    unrendered = set()
+    with timed("render", len(stale_pairs), kwargs.get("verbose")):
+        for (input_file, output_file), (_, error) in zip(
+            stale_pairs, schedule_files(stale_pairs, kwargs.get("jobs"))
+        ):
+            if error is not None:
+                print(error, file=sys.stderr)
+                failed.add(input_file)
+                unrendered.add(input_file)
+            elif manifest is not None:
+                manifest.record_output(
+                    input_file, output_file, input_states[input_file]
+                )
+        save_manifest(manifest)
+
+    if not kwargs.get("no_syscal") and not helper_installed(kwargs.get("helper")):
+        # Rendering and committing do not need the calendar.
+        print(
+            "Warning: event-helper is not installed, so the calendar was not "
+            "updated; give one with --helper or $%s, or pass --no-syscal"
+            % HELPER_ENVIRONMENT_VARIABLE,
+            file=sys.stderr,
+        )
+    elif not kwargs.get("no_syscal"):
+        # Every file is synced over a single event-helper session.
+        unsynced_files = [
+            input_file
+            for input_file, _ in file_pairs
+            if input_file not in failed
+            and (manifest is None or manifest.needs_sync(input_file))
+        ]
+        with timed("syscal", len(unsynced_files), kwargs.get("verbose")):
+            # A failed sync is reported, but the files are still committed.
+            if not sync_files(unsynced_files, **kwargs):
+                failed.update(unsynced_files)
+            elif manifest is not None:
+                for input_file in unsynced_files:
+                    manifest.record_sync(input_file)
+                save_manifest(manifest)
 
     if not kwargs.get("no_vcs"):
-        os.system("git add \\*.ptsched")
-        os.system(
-            'git commit -m "Schedule edit at %s"'
-            % datetime.datetime.now().strftime("%a %d %b %Y, %I:%M %p")
+        # Besides the files processed now, files rendered by a run that did
+        # not commit them may have changed.
+        uncommitted_files = [
+            input_file
+            for input_file, _ in file_pairs
+            if input_file in stale_files
+            or manifest is None
+            or manifest.needs_commit(input_file)
+        ]
+        with timed("vcs", len(uncommitted_files), kwargs.get("verbose")):
+            if (
+                commit_files(uncommitted_files, kwargs.get("quiet"))
+                and manifest is not None
+            ):
+                for input_file in uncommitted_files:
+                    if input_file not in unrendered:
+                        manifest.record_commit(input_file)
+                save_manifest(manifest)
+
+    return failed
+
+
+@contextlib.contextmanager
+def timed(step: str, files: int, verbose=False):
+    """Reports how long a step of the pipeline took, if ``verbose``."""
+    start = time.perf_counter()
+    yield
+    if verbose:
+        print(
+            "%s: %d files in %.1f ms"
+            % (step, files, (time.perf_counter() - start) * 1000),
+            file=sys.stderr,
+        )
+
+
+def commit_files(filenames: List[str], quiet=False) -> bool:
+    """Stages ``filenames`` with a single git invocation, reading the paths
+    from its standard input, and commits them unless nothing is staged.
+
+    Returns whether the files are committed, which they also are if nothing
+    changed. Git failures are reported, not raised, since the schedule
+    itself was already written.
+    """
+    if not filenames:
+        return True
+    paths = b"".join(os.fsencode(filename) + b"\0" for filename in filenames)
+    try:
+        subprocess.run(
+            [
+                "git",
+                "--literal-pathspecs",
+                "add",
+                "--pathspec-from-file=-",
+                "--pathspec-file-nul",
+            ],
+            input=paths,
+            check=True,
+        )
+        if subprocess.run(["git", "diff", "--cached", "--quiet"]).returncode == 0:
+            return True
+        subprocess.run(
+            ["git", "commit", *(["--quiet"] if quiet else []), "-m", commit_message()],
+            check=True,
         )
+    except (OSError, subprocess.CalledProcessError) as error:
+        print("Warning: could not commit the schedule files:", error, file=sys.stderr)
+        return False
+    return True
+
+
+def commit_message() -> str:
+    return "Schedule edit at %s" % datetime.datetime.now().strftime(
+        "%a %d %b %Y, %I:%M %p"
+    )
+
+
+def save_manifest(manifest: Optional[DirectoryManifest]):
+    if manifest is None:
+        return
+    try:
+        manifest.save()
+    except OSError as error:
+        print("Warning: could not save the manifest:", error, file=sys.stderr)
+
+
+def schedule_files(
+    file_pairs: List[Tuple[str, str]], jobs: Optional[int] = None
+) -> List[Tuple[str, Optional[str]]]:
+    """Renders each input file of ``file_pairs`` to its output file, using up
+    to ``jobs`` processes (by default one per CPU).
+
+    Returns each input file with the error that stopped it, or None.
+    """
+    jobs = min(jobs or os.cpu_count() or 1, len(file_pairs))
+    if jobs <= 1:
+        return [schedule_file(file_pair) for file_pair in file_pairs]
+
+    chunksize = max(1, len(file_pairs) // (jobs * CHUNKS_PER_JOB))
+    with multiprocessing.Pool(jobs) as pool:
+        return list(pool.imap(schedule_file, file_pairs, chunksize))
+
+
+def schedule_file(file_pair: Tuple[str, str]) -> Tuple[str, Optional[str]]:
+    """Parses one schedule file and merges it into its Markdown output,
+    keeping completed tasks checked. Errors are returned, not raised, so
+    that one bad file does not stop the others."""
+    input_file, output_file = file_pair
+    try:
+        with open(input_file) as file:
+            contents = file.read()
+        schedule = parse_str_cached(contents, input_file)
+
+        markdown = io.StringIO()
+        write_markdown(schedule, markdown)
+        update_file(markdown.getvalue(), output_file)
+    except UnexpectedInput as error:
+        return input_file, lark_error_handler(error, contents, input_file)
+    except ValidationErrors as error:
+        return input_file, "".join(error.format_errors())
+    except (OSError, UnicodeDecodeError) as error:
+        return input_file, f"Error when processing {input_file}: {error}"
+    return input_file, None
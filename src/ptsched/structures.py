@@ -4,6 +4,8 @@ import datetime
 class Task:
     """Represents a task."""
 
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         self.name = name
 
@@ -11,6 +13,8 @@ class Task:
 class SchoolClass:
     """Represents a class currently being taken."""
 
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         self.name = name
 
@@ -18,6 +22,8 @@ class SchoolClass:
 class Day:
     """Represents one day of tasks to do."""
 
+    __slots__ = ("date",)
+
     def __init__(self, date: datetime.date):
         self.date = date
 
@@ -28,6 +34,8 @@ class Day:
 class DayTransformed(Day):
     """Represents a day of tasks to do, organized by class."""
 
+    __slots__ = ("classes",)
+
     def __init__(self, date: datetime.date, classes: list["SchoolClassTransformed"]):
         super().__init__(date)
         self.classes = classes
@@ -36,6 +44,8 @@ class DayTransformed(Day):
 class DayReverse(Day):
     """Represents a day of tasks to do."""
 
+    __slots__ = ("tasks",)
+
     def __init__(self, date: datetime.date, tasks: list[Task]):
         super().__init__(date)
         self.tasks = tasks
@@ -44,6 +54,8 @@ class DayReverse(Day):
 class SchoolClassTransformed(SchoolClass):
     """Represents the tasks for one class on one day."""
 
+    __slots__ = ("tasks",)
+
     def __init__(self, name: str, tasks: list[Task]):
         super().__init__(name)
         self.tasks = tasks
@@ -52,6 +64,8 @@ class SchoolClassTransformed(SchoolClass):
 class SchoolClassReverse(SchoolClass):
     """Represents the tasks in the schedule for one class, organized by day."""
 
+    __slots__ = ("days",)
+
     def __init__(self, name: str, days: list[DayReverse]):
         super().__init__(name)
         self.days = days
@@ -60,7 +74,11 @@ class SchoolClassReverse(SchoolClass):
 class Schedule:
     """A schedule of tasks."""
 
+    __slots__ = ("metadata",)
+
     class Metadata:
+        __slots__ = ("start_date", "end_date")
+
         def __init__(self, start_date: datetime.date, end_date: datetime.date):
             self.start_date = start_date
             self.end_date = end_date
@@ -72,33 +90,54 @@ class Schedule:
 class ScheduleTransformed(Schedule):
     """The schedule organized by day and then by class."""
 
+    __slots__ = ("days",)
+
     def __init__(self, metadata: Schedule.Metadata, days: list[DayTransformed]):
         super().__init__(metadata)
         self.days = days
 
     def to_reverse(self) -> "ScheduleReverse":
-        classes = []
+        """Returns the same schedule organized by class.
+
+        Classes are in the order they first appear and their days keep the
+        order of ``days``, so that to_transformed gives this schedule back
+        when, as in parsed schedules, the days list their classes in that
+        order. The tasks are shared with this schedule.
+        """
+        classes: dict[str, SchoolClassReverse] = {}
         for day in self.days:
-            for task in day.tasks:
-                classes.append(
-                    SchoolClassReverse(task.name, [DayReverse(day.date, [task])])
-                )
-        return ScheduleReverse(self.metadata, classes)
+            for class_ in day.classes:
+                reverse_class = classes.get(class_.name)
+                if reverse_class is None:
+                    reverse_class = SchoolClassReverse(class_.name, [])
+                    classes[class_.name] = reverse_class
+                reverse_class.days.append(DayReverse(day.date, list(class_.tasks)))
+        return ScheduleReverse(self.metadata, list(classes.values()))
 
 
 class ScheduleReverse(Schedule):
     """The schedule organized by class and then by day."""
 
+    __slots__ = ("classes",)
+
     def __init__(self, metadata: Schedule.Metadata, classes: list[SchoolClassReverse]):
         super().__init__(metadata)
         self.classes = classes
 
     def to_transformed(self) -> "ScheduleTransformed":
-        days = []
-        for cls in self.classes:
-            for day in cls.days:
-                tasks = []
-                for task in day.tasks:
-                    tasks.append(Task(task.name))
-                days.append(DayTransformed(day.date, tasks))
-        return ScheduleTransformed(self.metadata, days)
+        """Returns the same schedule organized by day.
+
+        Days are in date order, each holding its classes in the order of
+        ``classes``. The tasks are shared with this schedule.
+        """
+        days: dict[datetime.date, DayTransformed] = {}
+        for class_ in self.classes:
+            for day in class_.days:
+                transformed_day = days.get(day.date)
+                if transformed_day is None:
+                    transformed_day = DayTransformed(day.date, [])
+                    days[day.date] = transformed_day
+                transformed_day.classes.append(
+                    SchoolClassTransformed(class_.name, list(day.tasks))
+                )
+        return ScheduleTransformed(self.metadata, [days[date] for date in sorted(days)])
@@ -1,10 +1,23 @@
-import importlib.resources as resources
+import contextlib
+import pathlib
 import sys
-import os
-import re
-import subprocess
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from ptsched.parse import parse
+import ptsched.utils as utils
+
+from ptsched.event_helper import (
+    DELETE,
+    UPDATE,
+    HelperError,
+    HelperSession,
+    Request,
+    event_id,
+    helper_command,
+)
+from ptsched.ledger import SyncLedger, day_digests
+from ptsched.parse.outputs import iter_default_day
+from ptsched.parse.parse import read_schedule
+from ptsched.structures import DayTransformed, ScheduleTransformed
 
 
 def syscal_cmd(arguments):
@@ -12,48 +25,158 @@ def syscal_cmd(arguments):
 
 
 def syscal(**kwargs):
-    output_tmp_filename = tmp_filename()
-    parse(output=output_tmp_filename, filename=kwargs["filename"])
-    with open(output_tmp_filename) as file:
-        parse_output = file.read()
-    os.remove(output_tmp_filename)
-
-    days = re.finditer(
-        r"(\d{4}-\d{2}-\d{2}):\n\n((?:.(?!\d{4}-\d{2}-\d{2}:\n\n))+)",
-        parse_output,
-        re.DOTALL,
-    )
-
-    with resources.path("ptsched.bin", "event-helper") as helper_path:
-        writing_subprocess = subprocess.Popen(
-            helper_path, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    if not sync_files([kwargs["filename"]], **kwargs):
+        exit(1)
+
+
+def sync_files(filenames: Iterable[str], **kwargs) -> bool:
+    """Syncs schedule files to the calendar with one event-helper session,
+    printing any errors, and returns whether the sync succeeded."""
+    try:
+        with CalendarSync(
+            kwargs.get("helper"), kwargs.get("protocol") or "auto", kwargs.get("all")
+        ) as sync:
+            for filename in filenames:
+                sync.add(filename, read_schedule(filename))
+    except (HelperError, OSError) as error:
+        print("Error when writing to the calendar:", error, file=sys.stderr)
+        return False
+
+    if not kwargs.get("quiet"):
+        print(sync.summary())
+    return True
+
+
+class CalendarSync:
+    """Sends the changes in any number of schedule files to the calendar over
+    a single event-helper session.
+
+    The helper is started by the first file with something to send, and the
+    sync ledgers are only updated once every request has been acknowledged.
+    """
+
+    def __init__(
+        self, helper: Optional[str] = None, protocol: str = "auto", send_all=False
+    ):
+        self.helper = helper
+        self.protocol = protocol
+        self.send_all = send_all
+        self.session: Optional[HelperSession] = None
+        self.ledgers: Dict[pathlib.Path, SyncLedger] = {}
+        self.pending = []
+        self.updated = 0
+        self.removed = 0
+        self.skipped = 0
+        self._helper_context = contextlib.ExitStack()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            return
+        if self.session is not None:
+            self.session.kill()
+        self._helper_context.close()
+
+    def ledger_for(self, filename: str) -> Optional[SyncLedger]:
+        ptsched_directory = utils.find_ptsched_directory(
+            pathlib.Path(filename).absolute().parent
+        )
+        if ptsched_directory is None:
+            return None
+        if ptsched_directory not in self.ledgers:
+            self.ledgers[ptsched_directory] = SyncLedger.load(ptsched_directory)
+        return self.ledgers[ptsched_directory]
+
+    def add(self, filename: str, schedule: ScheduleTransformed):
+        """Sends whatever changed in one schedule file since its last sync."""
+        ledger = self.ledger_for(filename)
+        previous = ledger.events(filename) if ledger is not None else {}
+        requests, events, skipped = plan_sync(schedule, previous, self.send_all)
+
+        if requests and self.session is None:
+            command = self._helper_context.enter_context(helper_command(self.helper))
+            self.session = HelperSession(command, self.protocol)
+        for request in requests:
+            self.session.send(request)
+
+        self.pending.append((ledger, filename, previous, requests, events))
+        updated = sum(request.operation == UPDATE for request in requests)
+        self.updated += updated
+        self.removed += len(requests) - updated
+        self.skipped += skipped
+
+    def close(self):
+        """Waits for the helper to finish and records what was sent."""
+        version = None
+        with self._helper_context:
+            if self.session is not None:
+                self.session.close()
+                version = self.session.version
+
+        for ledger, filename, previous, requests, events in self.pending:
+            if ledger is None:
+                continue
+            if version == 1:
+                # Protocol 1 cannot delete, so keep deleted events to retry.
+                events = {
+                    **{
+                        request.event_id: previous[request.event_id]
+                        for request in requests
+                        if request.operation == DELETE
+                    },
+                    **events,
+                }
+            ledger.record(filename, events)
+        self.pending = []
+
+        for ledger in self.ledgers.values():
+            try:
+                ledger.save()
+            except OSError as error:
+                print(
+                    "Warning: could not save the sync ledger:", error, file=sys.stderr
+                )
+
+    def summary(self) -> str:
+        return (
+            f"{self.updated} days updated, {self.removed} removed, "
+            f"{self.skipped} unchanged days skipped"
         )
-        id = 0
-        for day in days:
-            write_to_calendar(id, day[1], day[2], writing_subprocess.stdin)
-            id += 1
-
-        if writing_subprocess.stdin is not None:
-            writing_subprocess.stdin.flush()
-            writing_subprocess.stdin.close()
+
+
+def plan_sync(
+    schedule: ScheduleTransformed, previous: Dict[str, dict], send_all: bool = False
+) -> Tuple[List[Request], Dict[str, dict], int]:
+    """Compares a schedule with the events last sent for it.
+
+    Returns the requests that bring the calendar up to date, the events to
+    record once they are acknowledged, and how many days were unchanged.
+    With ``send_all``, unchanged days are sent too.
+    """
+    metadata = schedule.metadata
+    requests = []
+    events = {}
+    skipped = 0
+    for day in schedule.days:
+        date = str(day.date)
+        id = event_id(metadata.start_date, metadata.end_date, date)
+        events[id] = {"date": date, "classes": day_digests(day)}
+        if not send_all and previous.get(id) == events[id]:
+            skipped += 1
         else:
-            print("Warning: stdin does not exist on subprocess.", file=sys.stderr)
-        writing_subprocess.wait()
-
-
-def write_to_calendar(id, date, contents, subprocess_input):
-    subprocess_input.write(
-        (
-            "%d\nUPDATE\n%s\n%s\nEND REQUEST\n"
-            % (id, date, contents.removesuffix("\n"))
-        ).encode()
-    )
-    subprocess_input.flush()
-
-
-def tmp_filename():
-    return (
-        subprocess.check_output(["mktemp", "-t", "ptsched"])
-        .decode("utf-8")
-        .removesuffix("\n")
-    )
+            requests.append(Request(UPDATE, id, date, day_contents(day)))
+
+    for id, event in previous.items():
+        if id not in events:
+            requests.append(Request(DELETE, id, event["date"]))
+
+    return requests, events, skipped
+
+
+def day_contents(day: DayTransformed) -> str:
+    """Returns the event text of a day: the day in the normal output format,
+    without its final newline."""
+    return "".join(iter_default_day(day)).removesuffix("\n")
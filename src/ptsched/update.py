@@ -1,41 +1,69 @@
-import difflib
-import re
+import collections
+import os
+from typing import Iterable, Iterator, Optional, Tuple
+
+from ptsched.utils import write_if_changed
+
+DATE_HEADING = "# Tasks: "
+CLASS_HEADING = "## "
+UNCHECKED = "- [ ] "
+CHECKED = "- [x] "
+
+
+def task_keys(lines: Iterable[str]) -> Iterator[Optional[Tuple[str, str, str, int]]]:
+    """Yields the structural identity of each Markdown line: the date and
+    class headings it is under, its task text and how many identical tasks
+    came before it under the same headings. Lines that are not tasks yield
+    None."""
+    date = class_name = None
+    occurrences = collections.Counter()
+    for line in lines:
+        key = None
+        if line.startswith(DATE_HEADING):
+            date = line[len(DATE_HEADING) :]
+            class_name = None
+        elif line.startswith(CLASS_HEADING):
+            class_name = line[len(CLASS_HEADING) :]
+        elif line.startswith((UNCHECKED, CHECKED)):
+            task = (date, class_name, line[len(UNCHECKED) :])
+            occurrences[task] += 1
+            key = task + (occurrences[task],)
+        yield key
 
 
 def update_str(new_schedule, current_schedule):
-    current_schedule_stripped = re.sub(r"\[x\]", "[ ]", current_schedule)
-
-    diff_result = difflib.Differ().compare(
-        current_schedule_stripped.splitlines(), new_schedule.splitlines()
-    )
-
-    output_string = ""
-    current_schedule_lines = current_schedule.splitlines()
-    current_line = 0
-    for line in diff_result:
-        if line.startswith("?"):
-            continue
-        elif line.startswith("+"):
-            output_string += re.sub(r"^\+ ", "", line) + "\n"
-        elif line.startswith("-"):
-            current_line += 1
-        elif line.startswith(" "):
-            if "[x]" in current_schedule_lines[current_line]:
-                output_string += re.sub(r"\[ \]", "[x]", line[2:]) + "\n"
-            else:
-                output_string += line[2:] + "\n"
-            current_line += 1
-
-    return output_string
-
-
-def update_file(new_schedule, current_schedule_file):
-    """Updates the markdown file with the new schedule, keeping the Markdown check boxes checked if tasks are already completed."""
-
-    with open(current_schedule_file, "r") as file:
-        current_schedule = file.read()
-
-    output_string = update_str(new_schedule, current_schedule)
-
-    with open(current_schedule_file, "w") as file:
-        file.write(output_string)
+    """Returns ``new_schedule`` with the tasks that are checked in
+    ``current_schedule`` checked, wherever they moved to."""
+    current_lines = current_schedule.splitlines()
+    checked = {
+        key
+        for line, key in zip(current_lines, task_keys(current_lines))
+        if line.startswith(CHECKED)
+    }
+
+    new_lines = new_schedule.splitlines()
+    output = [
+        CHECKED + line[len(UNCHECKED) :]
+        if key in checked and line.startswith(UNCHECKED)
+        else line
+        for line, key in zip(new_lines, task_keys(new_lines))
+    ]
+    output.append("")
+    return "\n".join(output) if new_lines else ""
+
+
+def update_file(new_schedule, current_schedule_file) -> bool:
+    """Updates the markdown file with the new schedule, keeping the Markdown check boxes checked if tasks are already completed.
+
+    The file is only written if its contents change; returns whether it was."""
+
+    try:
+        with open(current_schedule_file, "r", newline="") as file:
+            current_schedule = file.read()
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(current_schedule_file) or ".", exist_ok=True)
+        current_schedule = None
+
+    output_string = update_str(new_schedule, current_schedule or "")
+
+    return write_if_changed(current_schedule_file, output_string, current_schedule)
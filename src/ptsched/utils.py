@@ -1,38 +1,223 @@
 import datetime
+import functools
+import hashlib
+import importlib.metadata
+import json
 import pathlib
 import os
+import re
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
-def scan(dir=str(pathlib.Path.cwd())):
-    result = []
-    path = pathlib.Path(dir)
-    for directory, _, files in os.walk(str(path)):
-        if ".ptschedignore" in files:
-            continue
-        for file in files:
-            if file.endswith(".ptsched"):
-                result.append(str(pathlib.Path(directory).joinpath(file)))
-    return result
+MONTHS = {
+    "January": 1,
+    "Jan": 1,
+    "February": 2,
+    "Feb": 2,
+    "March": 3,
+    "Mar": 3,
+    "April": 4,
+    "Apr": 4,
+    "May": 5,
+    "June": 6,
+    "Jun": 6,
+    "July": 7,
+    "Jul": 7,
+    "August": 8,
+    "Aug": 8,
+    "September": 9,
+    "Sep": 9,
+    "October": 10,
+    "Oct": 10,
+    "November": 11,
+    "Nov": 11,
+    "December": 12,
+    "Dec": 12,
+}
+
+
+def alternatives_pattern(names) -> str:
+    """Returns a regular expression alternation matching any of ``names``,
+    longest first, matching the lexer's preference for "January" over "Jan"."""
+    return "|".join(sorted(names, key=len, reverse=True))
+
+
+_DATE = r"([0-9]{1,2})[ \t]+(%s)[ \t]+([0-9]{4})" % alternatives_pattern(MONTHS)
+# The first line of a schedule, as the grammar's metadata rule accepts it.
+METADATA = re.compile(_DATE + r"[ \t]+-[ \t]+" + _DATE + r"[ \t\f\r]*")
+
+CACHE_DIRECTORY_NAME = ".ptsched-cache"
+IGNORE_FILE_NAME = ".ptschedignore"
+SCAN_INDEX_NAME = "scan-index.json"
+# Directories that never hold schedule files: version control, the rendered
+# Markdown and ptsched's own cache.
+IGNORED_DIRECTORIES = frozenset({".git", "out", CACHE_DIRECTORY_NAME})
+# A directory listing is only reused if the directory was last modified this
+# long before it was listed, since a change made within the same tick of a
+# coarse file system clock would not change its modification time.
+RACY_INTERVAL_NS = 2_000_000_000
+
+
+def list_directory(directory: str) -> Optional[Tuple[List[str], List[str]]]:
+    """Returns the names of the schedule files and of the subdirectories to
+    scan in ``directory``, or None if it contains a ``.ptschedignore``."""
+    files = []
+    directories = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            name = entry.name
+            if name == IGNORE_FILE_NAME:
+                return None
+            if entry.is_dir(follow_symlinks=False):
+                if name not in IGNORED_DIRECTORIES:
+                    directories.append(name)
+            elif name.endswith(".ptsched"):
+                files.append(name)
+    files.sort()
+    directories.sort()
+    return files, directories
+
+
+class ScanIndex:
+    """Remembers the listing of every directory scanned, with its
+    modification time, so that directories that have not changed since are
+    not listed again.
+
+    Only entries being added, removed or renamed change a directory's
+    modification time, which is all a listing depends on.
+    """
+
+    def __init__(self, path=None):
+        self.path = pathlib.Path(path) if path is not None else None
+        self.directories: Dict[str, dict] = {}
+        self.visited = set()
+        self.listings = 0
 
+    @classmethod
+    def for_directory(cls, path) -> Optional["ScanIndex"]:
+        """Loads the index kept in the cache of the ptsched directory
+        containing ``path``, or returns None if it is not in one."""
+        ptsched_directory = find_ptsched_directory(path)
+        if ptsched_directory is None:
+            return None
+        return cls.load(ptsched_directory / CACHE_DIRECTORY_NAME / SCAN_INDEX_NAME)
 
-def find_files(dir=str(pathlib.Path.cwd())):
-    result = []
-    path = pathlib.Path(dir)
-    for directory, _, files in os.walk(str(path)):
-        if ".ptschedignore" in files:
+    @classmethod
+    def load(cls, path) -> "ScanIndex":
+        index = cls(path)
+        try:
+            with open(path) as index_file:
+                index.directories = json.load(index_file)["directories"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return index
+
+    def list_directory(self, directory: str) -> Optional[Tuple[List[str], List[str]]]:
+        mtime = os.stat(directory).st_mtime_ns
+        self.visited.add(directory)
+        entry = self.directories.get(directory)
+        if (
+            entry is not None
+            and entry["mtime"] == mtime
+            and entry["listed"] - mtime > RACY_INTERVAL_NS
+        ):
+            return entry["listing"]
+
+        listed = time.time_ns()
+        listing = list_directory(directory)
+        self.listings += 1
+        self.directories[directory] = {
+            "mtime": mtime,
+            "listed": listed,
+            "listing": listing,
+        }
+        return listing
+
+    def save(self):
+        """Writes the entries of the directories visited since the index was
+        loaded, forgetting the others."""
+        directories = {
+            directory: self.directories[directory] for directory in sorted(self.visited)
+        }
+        make_cache_directory(self.path.parent)
+        write_if_changed(self.path, json.dumps({"directories": directories}))
+
+
+def walk_schedule_files(
+    dir: Optional[str] = None, index: Optional[ScanIndex] = None
+) -> Iterator[Tuple[str, List[str]]]:
+    """Yields every directory under ``dir`` (by default the working
+    directory) that may hold schedule files, with the paths of those it
+    does.
+
+    Directories containing a ``.ptschedignore`` are skipped with everything
+    under them, as are the IGNORED_DIRECTORIES.
+    """
+    stack = [dir or os.getcwd()]
+    while stack:
+        directory = stack.pop()
+        try:
+            if index is not None:
+                listing = index.list_directory(directory)
+            else:
+                listing = list_directory(directory)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
             continue
-        for file in files:
-            if file.endswith(".ptsched"):
-                result.append(str(pathlib.Path(directory).joinpath(file)))
-    return result
+        if listing is None:
+            continue
+        files, directories = listing
+        yield directory, [os.path.join(directory, name) for name in files]
+        stack.extend(os.path.join(directory, name) for name in reversed(directories))
+
+
+def find_files(dir: Optional[str] = None, index: Optional[ScanIndex] = None):
+    return [file for _, files in walk_schedule_files(dir, index) for file in files]
+
+
+scan = find_files
+
 
+def find_file_pairs(dir: Optional[str] = None, index: Optional[ScanIndex] = None):
+    """Pairs every schedule file under ``dir`` with the Markdown file it is
+    rendered to: the same relative path under ``dir/out``, ending in .md."""
+    dir = dir or os.getcwd()
+    return [file_pair(dir, file) for file in find_files(dir, index)]
 
-def find_file_pairs(dir=str(pathlib.Path.cwd())):
-    files = find_files(dir)
-    pairs = []
-    for file in files:
-        pairs.append((file, "out/" + file))
-    return pairs
+
+def file_pair(dir, file):
+    """Pairs the schedule file ``file`` under ``dir`` with its Markdown file."""
+    relative_path = os.path.relpath(file, dir)
+    return file, os.path.join(dir, "out", os.path.splitext(relative_path)[0] + ".md")
+
+
+def make_cache_directory(directory: pathlib.Path):
+    """Creates a ptsched directory's ``.ptsched-cache``, which git is told
+    to ignore."""
+    directory.mkdir(parents=True, exist_ok=True)
+    gitignore = directory / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n")
+
+
+def parse_dates(line: str, result: dict, line_number: int = 1):
+    """Reads the date range of a schedule's metadata line into the
+    "start_date" and "end_date" of ``result``.
+
+    Raises ValueError if the line is not a valid date range; the grammar
+    gives the detailed diagnostics.
+    """
+    metadata = METADATA.fullmatch(line.rstrip("\n"))
+    if metadata is None:
+        raise ValueError(f"line {line_number}: not a date range: {line.strip()!r}")
+    result["start_date"] = datetime.date(
+        int(metadata[3]), MONTHS[metadata[2]], int(metadata[1])
+    )
+    result["end_date"] = datetime.date(
+        int(metadata[6]), MONTHS[metadata[5]], int(metadata[4])
+    )
 
 
 def get_dates(start_date: datetime.date, end_date: datetime.date) -> set[datetime.date]:
@@ -41,3 +226,114 @@ def get_dates(start_date: datetime.date, end_date: datetime.date) -> set[datetim
         result.add(start_date)
         start_date += datetime.timedelta(days=1)
     return result
+
+
+def cache_directory() -> pathlib.Path:
+    """Returns the per-user directory that ptsched keeps derived files in."""
+    if os.environ.get("XDG_CACHE_HOME"):
+        base = pathlib.Path(os.environ["XDG_CACHE_HOME"])
+    elif sys.platform == "darwin":
+        base = pathlib.Path.home() / "Library" / "Caches"
+    else:
+        base = pathlib.Path.home() / ".cache"
+    return base / "ptsched"
+
+
+def config_directory() -> pathlib.Path:
+    """Returns the per-user directory that ptsched keeps its settings in."""
+    if os.environ.get("XDG_CONFIG_HOME"):
+        base = pathlib.Path(os.environ["XDG_CONFIG_HOME"])
+    elif sys.platform == "darwin":
+        base = pathlib.Path.home() / "Library" / "Application Support"
+    else:
+        base = pathlib.Path.home() / ".config"
+    return base / "ptsched"
+
+
+config_path = config_directory() / "config.json"
+
+
+def default_directory() -> Optional[str]:
+    """Returns the default ptsched directory set with ``init --set-default``,
+    or None if there is none."""
+    try:
+        with open(config_path) as config_file:
+            return json.load(config_file).get("defaultDirectory")
+    except FileNotFoundError:
+        return None
+
+
+@functools.cache
+def ptsched_version() -> str:
+    """Returns the installed ptsched version, used to key cached files."""
+    try:
+        return importlib.metadata.version("ptsched")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def find_ptsched_directory(path) -> Optional[pathlib.Path]:
+    """Returns the nearest directory at or above ``path`` that contains a
+    ``.ptscheddir`` file, or None."""
+    path = pathlib.Path(path).absolute()
+    for directory in (path, *path.parents):
+        if (directory / ".ptscheddir").is_file():
+            return directory
+    return None
+
+
+def write_if_changed(path, contents: str, current: Optional[str] = None) -> bool:
+    """Writes ``contents`` to ``path`` unless the file already holds exactly
+    that, and returns whether it wrote.
+
+    ``current`` is the file's contents if the caller has already read them.
+    The file is replaced atomically by renaming a temporary file in the same
+    directory over it, so readers never see a partly written file, and its
+    permissions are kept.
+    """
+    data = contents.encode()
+    path = os.path.realpath(path)
+    try:
+        if current is not None:
+            mode = os.stat(path).st_mode
+            if current.encode() == data:
+                return False
+        else:
+            with open(path, "rb") as file:
+                status = os.fstat(file.fileno())
+                mode = status.st_mode
+                # Only files of the same size are read and compared.
+                if status.st_size == len(data) and file.read() == data:
+                    return False
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    directory, name = os.path.split(path)
+    with tempfile.NamedTemporaryFile(
+        "wb", dir=directory, prefix=f".{name}-", suffix=".tmp", delete=False
+    ) as tmp_file:
+        tmp_file.write(data)
+    try:
+        os.chmod(tmp_file.name, mode & 0o7777)
+        os.replace(tmp_file.name, path)
+    except BaseException:
+        os.unlink(tmp_file.name)
+        raise
+    return True
+
+
+def file_state(path) -> Optional[Dict[str, int]]:
+    """Returns the modification time and size of a file, or None if it does
+    not exist."""
+    try:
+        status = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return {"mtime": status.st_mtime_ns, "size": status.st_size}
+
+
+def file_hash(path) -> str:
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
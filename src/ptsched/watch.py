@@ -0,0 +1,241 @@
+"""Keeps a ptsched directory scheduled while its files are edited.
+
+``ptsched watch`` runs the schedule pipeline once, then waits for schedule
+files to change and runs it again for just those files. The parser, the
+templates and the parse cache stay loaded between runs.
+
+On Linux, changes are reported by inotify, through ctypes. Elsewhere, or if
+inotify is unavailable, the directory is polled. Either way, a burst of
+changes (an editor's save, a ``git checkout``) is collected until the
+directory has been quiet for ``DEBOUNCE`` seconds, or for at most
+``MAX_DELAY`` seconds, and then handled at once.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Optional, Set
+
+import ptsched.utils as utils
+from ptsched.schedule import schedule_pairs
+
+DEBOUNCE = 0.2
+MAX_DELAY = 2.0
+POLL_INTERVAL = 1.0
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def watch_cmd(arguments):
+    watch(**vars(arguments))
+
+
+class PollingWatcher:
+    """Finds changed schedule files by comparing the stats of every file
+    under ``root`` every ``interval`` seconds.
+
+    Directories are only listed again when their modification time changes.
+    """
+
+    def __init__(self, root: str, interval: float = POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.index = utils.ScanIndex()
+        self.states = self._scan()
+
+    def _scan(self) -> Dict[str, Optional[Dict[str, int]]]:
+        return {
+            file: utils.file_state(file)
+            for file in utils.find_files(self.root, self.index)
+        }
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Waits up to ``timeout`` seconds, or until something changes if it
+        is None, and returns the schedule files that changed."""
+        while True:
+            time.sleep(
+                self.interval if timeout is None else min(timeout, self.interval)
+            )
+            states = self._scan()
+            changed = {
+                file
+                for file in states.keys() | self.states.keys()
+                if states.get(file) != self.states.get(file)
+            }
+            self.states = states
+            if changed or timeout is not None:
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Finds changed schedule files with Linux's inotify.
+
+    Every directory under ``root`` that may hold schedule files is watched;
+    directories that are created or moved in are watched as they appear.
+    """
+
+    def __init__(self, root: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.root = root
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.directories: Dict[int, str] = {}
+        self._watch_tree(root)
+
+    def _watch_tree(self, root: str) -> Set[str]:
+        """Watches ``root`` and the directories under it, and returns the
+        schedule files in them."""
+        files = set()
+        for directory, directory_files in utils.walk_schedule_files(root):
+            watch = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if watch < 0:
+                # The directory disappeared, or the watch limit was reached.
+                continue
+            self.directories[watch] = directory
+            files.update(directory_files)
+        return files
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Waits up to ``timeout`` seconds, or until something changes if it
+        is None, and returns the schedule files that changed."""
+        changed = set()
+        while not changed:
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+            if not readable:
+                break
+            data = os.read(self.fd, 64 * 1024)
+            offset = 0
+            while offset < len(data):
+                watch, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                changed |= self._handle(watch, mask, name)
+            if timeout is not None:
+                break
+        return changed
+
+    def _handle(self, watch: int, mask: int, name: str) -> Set[str]:
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost; treat every file as changed.
+            return set(utils.find_files(self.root))
+        if mask & IN_IGNORED:
+            self.directories.pop(watch, None)
+            return set()
+        directory = self.directories.get(watch)
+        if directory is None:
+            return set()
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if (
+                mask & (IN_CREATE | IN_MOVED_TO)
+                and name not in utils.IGNORED_DIRECTORIES
+            ):
+                return self._watch_tree(path)
+            return set()
+        if name.endswith(".ptsched") and not mask & IN_CREATE:
+            # A created file is reported again once it is written and closed.
+            return {path}
+        return set()
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(root: str, poll=False, interval: float = POLL_INTERVAL):
+    """Returns an InotifyWatcher for ``root``, or a PollingWatcher if
+    ``poll`` is set or inotify is unavailable."""
+    if not poll and sys.platform == "linux":
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as error:
+            print(
+                "Warning: cannot use inotify (%s); polling instead." % error,
+                file=sys.stderr,
+            )
+    return PollingWatcher(root, interval)
+
+
+def collect_changes(
+    watcher, debounce: float = DEBOUNCE, max_delay: float = MAX_DELAY
+) -> Set[str]:
+    """Waits for a change, then returns every file that changes until none has
+    for ``debounce`` seconds, or ``max_delay`` seconds have passed."""
+    changed = watcher.changes()
+    deadline = time.monotonic() + max_delay
+    while True:
+        remaining = min(debounce, deadline - time.monotonic())
+        if remaining <= 0:
+            return changed
+        more = watcher.changes(remaining)
+        if not more:
+            return changed
+        changed |= more
+
+
+def watch(**kwargs):
+    directory = kwargs.get("directory") or utils.default_directory()
+    if directory is None:
+        print(
+            "No ptsched configuration has been set. Run\n\n\tptsched --set-default\n\nin your directory of choice, or give a directory to watch.",
+            file=sys.stderr,
+        )
+        exit(1)
+    os.chdir(directory)
+    root = os.getcwd()
+    # Keep the parser, templates and caches warm in this process.
+    kwargs["jobs"] = kwargs.get("jobs") or 1
+
+    watcher = open_watcher(
+        root, kwargs.get("poll"), kwargs.get("interval") or POLL_INTERVAL
+    )
+    run_pipeline(utils.find_file_pairs(root), **kwargs)
+    if not kwargs.get("quiet"):
+        print("Watching %s for changes." % root, file=sys.stderr)
+    try:
+        while True:
+            changed = collect_changes(watcher)
+            file_pairs = [
+                utils.file_pair(root, file)
+                for file in sorted(changed)
+                if os.path.exists(file)
+            ]
+            if file_pairs:
+                run_pipeline(file_pairs, **kwargs)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def run_pipeline(file_pairs, **kwargs):
+    """Runs the schedule pipeline, reporting rather than raising its errors
+    so that the watch carries on until they are fixed."""
+    try:
+        schedule_pairs(file_pairs, **kwargs)
+    except SystemExit:
+        # The error was already reported.
+        pass
+    except Exception as error:
+        print("Error when scheduling:", error, file=sys.stderr)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""A stand-in for event-helper, for tests and benchmarks.
+
+Speaks protocol 2 when started with --protocol=2, and answers
+--protocol-version with its greeting, unless --v1-only is given; it speaks
+protocol 1 otherwise. With --strict it rejects both arguments, like a helper
+that does not know them. The calendar it maintains is read from and written
+back to the JSON file given with --calendar: it maps each event ID (for
+protocol 1, each date) to the event's date, revision and contents. Batches
+containing a request for the date given with --fail-on are answered with
+ERROR.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+
+def read_calendar(filename):
+    if filename is None or not os.path.exists(filename):
+        return {}
+    with open(filename) as calendar_file:
+        return json.load(calendar_file)
+
+
+def serve_v1(calendar, infile):
+    while infile.readline():
+        operation = infile.readline().decode().rstrip("\n")
+        date = infile.readline().decode().rstrip("\n")
+        lines = []
+        for line in iter(infile.readline, b""):
+            line = line.decode().rstrip("\n")
+            if line == "END REQUEST":
+                break
+            lines.append(line)
+        if operation == "UPDATE":
+            calendar[date] = {
+                "date": date,
+                "revision": None,
+                "contents": "\n".join(lines),
+            }
+
+
+def serve_v2(calendar, infile, outfile, fail_on):
+    outfile.write(b"PTSCHED-EVENT-HELPER 2\n")
+    outfile.flush()
+    for line in iter(infile.readline, b""):
+        _, sequence, count = line.decode().split()
+        failed = False
+        for _ in range(int(count)):
+            operation, event_id, date, revision, length = (
+                infile.readline().decode().split()
+            )
+            contents = infile.read(int(length)).decode()
+            infile.read(1)
+            failed = failed or date == fail_on
+            if operation == "UPDATE":
+                calendar[event_id] = {
+                    "date": date,
+                    "revision": revision,
+                    "contents": contents,
+                }
+            elif operation == "DELETE":
+                calendar.pop(event_id, None)
+        if failed:
+            outfile.write(f"ERROR {sequence} cannot write {fail_on}\n".encode())
+        else:
+            outfile.write(f"ACK {sequence}\n".encode())
+        outfile.flush()
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--protocol")
+    argument_parser.add_argument("--calendar")
+    argument_parser.add_argument("--fail-on")
+    argument_parser.add_argument("--protocol-version", action="store_true")
+    argument_parser.add_argument("--v1-only", action="store_true")
+    argument_parser.add_argument("--strict", action="store_true")
+    args = argument_parser.parse_args()
+
+    if args.strict and (args.protocol or args.protocol_version):
+        argument_parser.error("unrecognized arguments")
+    if args.protocol_version and not args.v1_only:
+        print("PTSCHED-EVENT-HELPER 2")
+        return
+
+    calendar = read_calendar(args.calendar)
+    if args.protocol == "2" and not args.v1_only:
+        serve_v2(calendar, sys.stdin.buffer, sys.stdout.buffer, args.fail_on)
+    else:
+        serve_v1(calendar, sys.stdin.buffer)
+
+    if args.calendar is not None:
+        with open(args.calendar, "w") as calendar_file:
+            json.dump(calendar, calendar_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from ptsched.parse.cache import DiskStore, ParseCache, cache_key, store_directory
+from ptsched.parse.parse import parse_str, parse_str_cached
+
+SCHEDULE = """4 March 2024 - 5 March 2024
+
+# History 201
+
+- Mon 4
+Read chapter 12
+
+- Tue 5
+Review notes
+"""
+
+
+class Test_cache(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = pathlib.Path(temporary_directory.name)
+        (self.directory / ".ptscheddir").touch()
+        (self.directory / "term").mkdir()
+        self.filename = str(self.directory / "term" / "2024-03-04.ptsched")
+        self.cache_home = self.directory / "cache"
+        environment = mock.patch.dict(os.environ, XDG_CACHE_HOME=str(self.cache_home))
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def parse(self, cache, contents):
+        return parse_str_cached(contents, self.filename, cache)
+
+    def test_tiers(self):
+        cache = ParseCache()
+        first = self.parse(cache, SCHEDULE)
+        self.assertIs(self.parse(cache, SCHEDULE), first)
+        self.assertEqual((cache.memory_hits, cache.disk_hits, cache.misses), (1, 0, 1))
+
+        # A new process only has the disk tier.
+        cache = ParseCache()
+        schedule = self.parse(cache, SCHEDULE)
+        self.assertEqual((cache.memory_hits, cache.disk_hits, cache.misses), (0, 1, 0))
+        self.assertEqual(
+            [task.name for task in schedule.days[1].classes[0].tasks], ["Review notes"]
+        )
+        self.assertIn("1 disk hits", cache.stats())
+
+        # Nothing is read from or written to the ptsched directory itself.
+        self.assertTrue(store_directory(self.directory).is_relative_to(self.cache_home))
+        self.assertFalse((self.directory / ".ptsched-cache").exists())
+
+    def test_key_changes_with_contents(self):
+        self.assertNotEqual(
+            cache_key(SCHEDULE), cache_key(SCHEDULE.replace("notes", "slides"))
+        )
+
+    def test_no_ptsched_directory(self):
+        os.remove(self.directory / ".ptscheddir")
+        cache = ParseCache()
+        self.parse(cache, SCHEDULE)
+        self.assertFalse((self.cache_home / "ptsched" / "parse").exists())
+
+    def test_stores_of_removed_directories_pruned(self):
+        self.parse(ParseCache(), SCHEDULE)
+        old_store = store_directory(self.directory)
+        self.assertTrue(old_store.exists())
+        os.remove(self.directory / ".ptscheddir")
+
+        other_directory = self.directory / "other"
+        other_directory.mkdir()
+        (other_directory / ".ptscheddir").touch()
+        parse_str_cached(SCHEDULE, str(other_directory / "a.ptsched"), ParseCache())
+        self.assertTrue(store_directory(other_directory).exists())
+        self.assertFalse(old_store.exists())
+
+    def test_memory_eviction(self):
+        cache = ParseCache(memory_entries=1)
+        self.parse(cache, SCHEDULE)
+        self.parse(cache, SCHEDULE.replace("notes", "slides"))
+        self.assertEqual(len(cache.memory), 1)
+
+    def test_disk_eviction(self):
+        store = DiskStore(self.directory / "store", max_bytes=2000)
+        schedule = parse_str(SCHEDULE, self.filename)
+        for index in range(20):
+            store.put(cache_key(str(index)), schedule)
+        self.assertGreater(store.evictions, 0)
+        self.assertLessEqual(sum(size for _, size, _ in store._entries()), 2000)
+        self.assertIsNotNone(store.get(cache_key("19")))
+
+    def test_corrupt_entry(self):
+        store = DiskStore(self.directory / "store")
+        key = cache_key(SCHEDULE)
+        store.put(key, parse_str(SCHEDULE, self.filename))
+        store.path(key).write_bytes(b"truncated")
+        self.assertIsNone(store.get(key))
+        self.assertFalse(store.path(key).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
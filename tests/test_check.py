@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+import collections
+import contextlib
+import datetime
+import io
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from ptsched.check import check, check_schedules
+from ptsched.structures import (
+    DayTransformed,
+    ScheduleTransformed,
+    SchoolClassTransformed,
+)
+from ptsched.utils import get_dates
+
+INPUT_DIRECTORY = "tests/test_data/input/basic24"
+
+OVERLAPPING = """5 March 2024 - 5 March 2024
+
+# Latin 101
+
+- Tue 5
+Lab report
+
+# History 201
+
+- Tue 5
+Extra reading
+"""
+
+
+class Test_check(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = os.path.join(temporary_directory.name, "term")
+        shutil.copytree(INPUT_DIRECTORY, self.directory)
+
+    def check(self, **kwargs):
+        output = io.StringIO()
+        errors = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+            try:
+                check(directory=self.directory, **kwargs)
+                status = 0
+            except SystemExit as exit:
+                status = exit.code
+        return status, output.getvalue(), errors.getvalue()
+
+    def test_gap(self):
+        self.assertEqual(
+            self.check(),
+            (0, "2 files checked: 0 invalid, 0 conflicts, 0 gaps\n", ""),
+        )
+
+        status, output, errors = self.check(weekend_gaps=True)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, "2 files checked: 0 invalid, 0 conflicts, 1 gaps\n")
+        self.assertIn("2024-03-04.ptsched:1 - 2 days between", errors)
+        self.assertIn("(2024-03-02 to 2024-03-03)", errors)
+        self.assertIn("   1 | 4 March 2024 - 8 March 2024\n", errors)
+
+        self.assertEqual(self.check(no_gaps=True, quiet=True), (0, "", ""))
+
+    def test_one_day_gap(self):
+        shutil.rmtree(self.directory)
+        os.mkdir(self.directory)
+        for day, weekday in (("4", "Mon"), ("6", "Wed")):
+            with open(os.path.join(self.directory, f"{day}.ptsched"), "w") as file:
+                file.write(
+                    f"{day} March 2024 - {day} March 2024\n\n"
+                    f"# History 201\n\n- {weekday} {day}\nRead\n"
+                )
+        status, output, errors = self.check()
+        self.assertIn("1 gaps", output)
+        self.assertIn("1 day between", errors)
+        self.assertIn(
+            "and this schedule is not covered (2024-03-05 to 2024-03-05)", errors
+        )
+
+    def test_conflict(self):
+        with open(os.path.join(self.directory, "overlap.ptsched"), "w") as file:
+            file.write(OVERLAPPING)
+
+        status, output, errors = self.check(no_gaps=True)
+        self.assertEqual(status, 1)
+        self.assertIn("0 invalid, 1 conflicts", output)
+        self.assertIn(
+            'overlap.ptsched:10 - "History 201" on 2024-03-05 is also scheduled at '
+            f"{os.path.join(self.directory, '2024-03-04.ptsched')}:10",
+            errors,
+        )
+        self.assertIn("  10 | - Tue 5\n", errors)
+        self.assertNotIn("Latin 101", errors)
+
+    def test_invalid_file(self):
+        with open(os.path.join(self.directory, "broken.ptsched"), "w") as file:
+            file.write("4 March 2024 31 March 2024\n")
+        status, output, errors = self.check(no_gaps=True)
+        self.assertEqual(status, 1)
+        self.assertIn("3 files checked: 1 invalid, 0 conflicts", output)
+        self.assertIn("Missing dash in metadata", errors)
+
+    def test_undecodable_file(self):
+        with open(os.path.join(self.directory, "binary.ptsched"), "wb") as file:
+            file.write(b"4 March 2024 - 5 March 2024\n\xff\xfe\n")
+        status, output, errors = self.check(no_gaps=True)
+        self.assertEqual(status, 1)
+        self.assertIn("3 files checked: 1 invalid, 0 conflicts", output)
+        self.assertIn("binary.ptsched", errors)
+
+    def test_matches_pairwise(self):
+        generator = random.Random(23)
+        classes = ["History 201", "Physics 150", "Math 101", "Latin 101"]
+        schedules = []
+        for number in range(60):
+            start = datetime.date(2024, 1, 1) + datetime.timedelta(
+                days=generator.randrange(200)
+            )
+            end = start + datetime.timedelta(days=generator.randrange(10))
+            file_classes = generator.sample(classes, generator.randint(1, 3))
+            days = [
+                DayTransformed(
+                    start + datetime.timedelta(days=offset),
+                    [SchoolClassTransformed(name, []) for name in file_classes],
+                )
+                for offset in range((end - start).days + 1)
+            ]
+            schedules.append(
+                (
+                    f"{number}.ptsched",
+                    ScheduleTransformed(ScheduleTransformed.Metadata(start, end), days),
+                )
+            )
+
+        conflicts, gaps = check_schedules(schedules, weekend_gaps=True)
+
+        occurrences = collections.Counter(
+            (day.date, class_.name)
+            for _, schedule in schedules
+            for day in schedule.days
+            for class_ in day.classes
+        )
+        self.assertEqual(
+            collections.Counter(
+                (conflict.date, conflict.class_name) for conflict in conflicts
+            ),
+            +collections.Counter(
+                {key: count - 1 for key, count in occurrences.items()}
+            ),
+        )
+
+        covered = {day.date for _, schedule in schedules for day in schedule.days}
+        uncovered = {
+            gap.start_date + datetime.timedelta(days=offset)
+            for gap in gaps
+            for offset in range((gap.end_date - gap.start_date).days + 1)
+        }
+        self.assertEqual(uncovered, get_dates(min(covered), max(covered)) - covered)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+import json
+import os
+import shlex
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from ptsched import event_helper
+from ptsched.event_helper import (
+    DELETE,
+    NOOP,
+    UPDATE,
+    HelperError,
+    HelperSession,
+    Request,
+)
+from ptsched.syscal import syscal
+
+STUB = os.path.join(os.path.dirname(__file__), "event_helper_stub.py")
+SCHEDULE_FILE = "tests/test_data/input/basic24/2024-03-04.ptsched"
+
+
+class Test_event_helper(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.calendar_file = os.path.join(temporary_directory.name, "calendar.json")
+        environment = mock.patch.dict(
+            os.environ,
+            XDG_CACHE_HOME=os.path.join(temporary_directory.name, "cache"),
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def command(self, *arguments):
+        return [sys.executable, STUB, "--calendar", self.calendar_file, *arguments]
+
+    def calendar(self):
+        with open(self.calendar_file) as calendar_file:
+            return json.load(calendar_file)
+
+    def test_protocol_2(self):
+        with HelperSession(self.command(), batch_size=2, window=1) as session:
+            self.assertEqual(session.version, 2)
+            for day in range(1, 8):
+                session.send(Request(UPDATE, f"id{day}", f"2024-03-0{day}", "Read"))
+            session.send(Request(DELETE, "id7", "2024-03-07"))
+            session.send(Request(NOOP, "id6", "2024-03-06"))
+
+        calendar = self.calendar()
+        self.assertEqual(sorted(calendar), [f"id{day}" for day in range(1, 7)])
+        self.assertEqual(calendar["id1"]["contents"], "Read")
+
+    def test_framing(self):
+        contents = "History 201:\nEND REQUEST\n\nBATCH 9 9\nCafé"
+        with HelperSession(self.command()) as session:
+            session.send(Request(UPDATE, "id", "2024-03-04", contents))
+        self.assertEqual(self.calendar()["id"]["contents"], contents)
+
+    def test_error_acknowledgement(self):
+        with self.assertRaises(HelperError) as context:
+            with HelperSession(self.command("--fail-on", "2024-03-05")) as session:
+                session.send(Request(UPDATE, "id4", "2024-03-04", "Read"))
+                session.send(Request(UPDATE, "id5", "2024-03-05", "Read"))
+        self.assertIn("cannot write 2024-03-05", str(context.exception))
+
+    def test_fallback_to_protocol_1(self):
+        with HelperSession(self.command("--v1-only")) as session:
+            self.assertEqual(session.version, 1)
+            session.send(Request(UPDATE, "id4", "2024-03-04", "Read\nNotes"))
+            session.send(Request(NOOP, "id5", "2024-03-05"))
+        self.assertEqual(self.calendar()["2024-03-04"]["contents"], "Read\nNotes")
+
+    def test_protocol_remembered(self):
+        for arguments, version in (([], 2), (["--v1-only"], 1)):
+            with mock.patch.object(
+                event_helper, "probe_protocol", wraps=event_helper.probe_protocol
+            ) as probe:
+                for _ in range(2):
+                    with HelperSession(self.command(*arguments)) as session:
+                        self.assertEqual(session.version, version)
+            self.assertEqual(probe.call_count, 1)
+
+    def test_strict_protocol_1(self):
+        with HelperSession(self.command("--strict")) as session:
+            self.assertEqual(session.version, 1)
+            session.send(Request(UPDATE, "id4", "2024-03-04", "Read"))
+        self.assertEqual(self.calendar()["2024-03-04"]["contents"], "Read")
+
+    def test_no_greeting_falls_back(self):
+        for arguments in (["--strict"], ["--v1-only"]):
+            with (
+                self.subTest(arguments=arguments),
+                mock.patch.object(event_helper, "REQUIRED_GREETING_TIMEOUT", 0.2),
+                mock.patch.object(event_helper, "probe_protocol", return_value=2),
+            ):
+                with HelperSession(self.command(*arguments)) as session:
+                    self.assertEqual(session.version, 1)
+                    session.send(Request(UPDATE, "id4", "2024-03-04", "Read"))
+                self.assertEqual(self.calendar()["2024-03-04"]["contents"], "Read")
+                self.assertEqual(
+                    event_helper.detect_protocol(self.command(*arguments)), 1
+                )
+
+    @mock.patch.object(event_helper, "REQUIRED_GREETING_TIMEOUT", 0.2)
+    def test_protocol_2_required(self):
+        with self.assertRaises(HelperError):
+            HelperSession(self.command("--v1-only"), protocol="2")
+
+    def test_missing_helper(self):
+        with (
+            mock.patch.dict(os.environ),
+            mock.patch.object(
+                event_helper.resources, "files", side_effect=ModuleNotFoundError
+            ),
+        ):
+            os.environ.pop(event_helper.HELPER_ENVIRONMENT_VARIABLE, None)
+            with self.assertRaises(HelperError):
+                with event_helper.helper_command():
+                    pass
+
+    def test_syscal(self):
+        helper = shlex.join(self.command())
+        with mock.patch.dict(os.environ, PTSCHED_EVENT_HELPER=helper):
+            syscal(filename=SCHEDULE_FILE)
+        first_run = self.calendar()
+
+        os.remove(self.calendar_file)
+        syscal(filename=SCHEDULE_FILE, helper=helper)
+        # Event IDs are stable between runs.
+        self.assertEqual(self.calendar(), first_run)
+        self.assertEqual(
+            sorted(event["date"] for event in first_run.values())[0], "2024-03-04"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from ptsched import utils
+from ptsched.find import DateIndex, find
+
+
+def schedule_head(start, end):
+    return "%s - %s\n" % (start.strftime("%d %B %Y"), end.strftime("%d %b %Y"))
+
+
+class Test_find(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        config_path = os.path.join(self.directory, "config.json")
+        with open(config_path, "w") as config_file:
+            json.dump({"defaultDirectory": self.directory}, config_file)
+        patcher = mock.patch.object(utils, "config_path", config_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, name, start, end):
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write("\n" + schedule_head(start, end) + "\n# History 201\n")
+        return path
+
+    def find(self, **kwargs):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            find(**kwargs)
+        return output.getvalue().strip()
+
+    def test_find(self):
+        march = self.write(
+            "term/march.ptsched", datetime.date(2024, 3, 4), datetime.date(2024, 3, 10)
+        )
+        april = self.write(
+            "term/april.ptsched", datetime.date(2024, 4, 1), datetime.date(2024, 4, 7)
+        )
+        self.write(
+            "term/broken.ptsched", datetime.date(2024, 3, 4), datetime.date(2024, 3, 4)
+        )
+        with open(os.path.join(self.directory, "term", "broken.ptsched"), "w") as file:
+            file.write("Not a schedule\n")
+
+        self.assertEqual(self.find(directory=True), self.directory)
+        self.assertEqual(self.find(date="2024-03-05"), march)
+        self.assertEqual(self.find(date="2024-03-12"), march)
+        self.assertEqual(self.find(date="2024-03-30"), april)
+        self.assertEqual(self.find(date="2025-01-01"), april)
+
+        # Changed files are read again.
+        self.write(
+            "term/march.ptsched", datetime.date(2024, 2, 5), datetime.date(2024, 2, 11)
+        )
+        self.assertEqual(self.find(date="2024-03-12"), april)
+        os.remove(april)
+        self.assertEqual(self.find(date="2024-03-12"), march)
+
+    def test_index_reads_only_changed_files(self):
+        paths = [
+            self.write(
+                f"week-{week}.ptsched",
+                datetime.date(2024, 1, 1) + datetime.timedelta(weeks=week),
+                datetime.date(2024, 1, 7) + datetime.timedelta(weeks=week),
+            )
+            for week in range(10)
+        ]
+        self.assertEqual(self.find(date="2024-01-20"), paths[2])
+        with mock.patch("ptsched.find.read_date_range") as read_date_range:
+            self.assertEqual(self.find(date="2024-02-01"), paths[4])
+        read_date_range.assert_not_called()
+
+    def test_matches_linear_search(self):
+        generator = random.Random(22)
+        index = DateIndex()
+        files = {}
+        for number in range(200):
+            start = datetime.date(2024, 1, 1) + datetime.timedelta(
+                days=generator.randrange(365)
+            )
+            end = start + datetime.timedelta(days=generator.randrange(40))
+            files[f"{number}.ptsched"] = {
+                "mtime": 0,
+                "size": 0,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+            }
+        index.files = files
+        index._sort()
+
+        for offset in range(-20, 420):
+            date = datetime.date(2024, 1, 1) + datetime.timedelta(days=offset)
+            key = date.isoformat()
+            covering = {
+                filename
+                for filename, entry in files.items()
+                if entry["start"] <= key <= entry["end"]
+            }
+            if covering:
+                self.assertIn(index.covering(date), covering)
+                self.assertIn(index.nearest(date), covering)
+                continue
+
+            self.assertIsNone(index.covering(date))
+            distance = min(
+                min(
+                    abs((datetime.date.fromisoformat(entry[edge]) - date).days)
+                    for edge in ("start", "end")
+                )
+                for entry in files.values()
+            )
+            entry = files[index.nearest(date)]
+            self.assertEqual(
+                min(
+                    abs((datetime.date.fromisoformat(entry[edge]) - date).days)
+                    for edge in ("start", "end")
+                ),
+                distance,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
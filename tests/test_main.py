@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = {"lark", "mako", "multiprocessing", "difflib"}
+
+
+def import_times(code):
+    """Runs ``code`` under ``-X importtime`` and returns the cumulative import
+    time of every module it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class Test_main(unittest.TestCase):
+    def assertLightweight(self, code):
+        times = import_times(code)
+        self.assertFalse(
+            HEAVY_MODULES & {name.split(".")[0] for name in times},
+            msg="%r imported a heavy dependency" % code,
+        )
+
+    def test_import_main(self):
+        self.assertLightweight("import ptsched.main")
+
+    def test_import_package(self):
+        self.assertLightweight("import ptsched")
+
+    def test_find_dispatch(self):
+        self.assertLightweight(
+            "from ptsched.main import load_command; load_command('find')"
+        )
+
+    def test_commands_resolve(self):
+        from ptsched.main import COMMANDS, load_command
+
+        for name in COMMANDS:
+            self.assertTrue(callable(load_command(name)))
+
+    def test_lazy_exports(self):
+        import ptsched
+
+        for name in ptsched.__all__:
+            self.assertTrue(callable(getattr(ptsched, name)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+import datetime
+import io
+import os
+import tempfile
+import unittest
+
+from ptsched.parse import outputs
+from ptsched.parse.parse import parse, parse_str
+from ptsched.parse.templates import get_template
+from ptsched.structures import (
+    DayTransformed,
+    SchoolClassTransformed,
+    ScheduleTransformed,
+    Task,
+)
+
+INPUT_DIRECTORY = "tests/test_data/input"
+
+
+def template_default(schedule):
+    template = get_template("default")
+    return "".join(
+        ("\n" if idx > 0 else "") + str(day.date) + ":\n\n" + template.render(day=day)
+        for idx, day in enumerate(schedule.days)
+    )
+
+
+def template_markdown(schedule):
+    template = get_template("markdown")
+    return "".join(
+        ("\n" if idx > 0 else "") + template.render(day=day)
+        for idx, day in enumerate(schedule.days)
+    )
+
+
+def schedules():
+    for directory, _, files in os.walk(INPUT_DIRECTORY):
+        for file in sorted(files):
+            filename = os.path.join(directory, file)
+            with open(filename) as input_file:
+                yield filename, parse_str(input_file.read(), filename)
+
+    # Classes and days without tasks, which the test data does not cover.
+    yield (
+        "sparse",
+        ScheduleTransformed(
+            None,
+            [
+                DayTransformed(datetime.date(2024, 3, 4), []),
+                DayTransformed(
+                    datetime.date(2024, 3, 5),
+                    [
+                        SchoolClassTransformed("History 201", []),
+                        SchoolClassTransformed("Physics 150", [Task("Lab")]),
+                        SchoolClassTransformed("Latin 101", []),
+                    ],
+                ),
+            ],
+        ),
+    )
+
+
+class Test_outputs(unittest.TestCase):
+    def test_matches_templates(self):
+        for name, schedule in schedules():
+            for writer, template in [
+                (outputs.write_default, template_default),
+                (outputs.write_markdown, template_markdown),
+            ]:
+                with self.subTest(name=name, writer=writer.__name__):
+                    outfile = io.StringIO()
+                    writer(schedule, outfile)
+                    self.assertEqual(outfile.getvalue(), template(schedule))
+
+    def test_output_file_written_only_when_changed(self):
+        input_file = os.path.join(INPUT_DIRECTORY, "basic24", "2024-03-01.ptsched")
+        with tempfile.TemporaryDirectory() as directory:
+            output_file = os.path.join(directory, "schedule.md")
+            parse(filename=input_file, output=output_file, markdown=True)
+            with open(output_file) as file:
+                contents = file.read()
+            self.assertTrue(contents.startswith("# Tasks: "))
+
+            os.utime(output_file, ns=(0, 0))
+            parse(filename=input_file, output=output_file, markdown=True)
+            self.assertEqual(os.stat(output_file).st_mtime_ns, 0)
+
+            parse(filename=input_file, output=output_file, normal=True)
+            with open(output_file) as file:
+                self.assertNotEqual(file.read(), contents)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from lark.exceptions import UnexpectedInput
+
+from ptsched.parse.error_classifier import ERROR_EXAMPLES
+from ptsched.parse.error_handling import lark_error_handler
+from ptsched.parse.parse import parse_str
+from ptsched.parse.parser import get_error_classifier, get_parser
+from ptsched.parse.transformer import ScheduleTransformer
+from ptsched.parse.validate import ValidationErrors, validate_schedule
+
+SCHEDULE = """4 March 2024 - 5 March 2024
+
+# History 201
+
+- Mon 4
+Read chapter 12
+
+- Tue 5
+Review notes"""
+
+# Loading the cached parser tables must stay well under the time it takes to
+# compile the grammar.
+PARSER_STARTUP_BUDGET = 0.05
+
+STARTUP_SCRIPT = """
+import time
+from ptsched.parse.parser import get_parser, load_parser, parser_cache_path
+
+assert load_parser.cache_info().currsize == 0, "parser built on import"
+start = time.perf_counter()
+get_parser()
+print(time.perf_counter() - start)
+print(parser_cache_path().exists())
+"""
+
+
+class Test_parser(unittest.TestCase):
+    def test_parser_is_deterministic(self):
+        self.assertEqual(get_parser().options.parser, "lalr")
+        self.assertEqual(get_parser().options.lexer, "contextual")
+
+    def test_missing_final_newline(self):
+        with_newline = parse_str(SCHEDULE + "\n", "test.ptsched")
+        without_newline = parse_str(SCHEDULE, "test.ptsched")
+        self.assertEqual(
+            [task.name for task in without_newline.days[1].classes[0].tasks],
+            ["Review notes"],
+        )
+        self.assertEqual(len(with_newline.days), len(without_newline.days))
+
+    def test_days_sorted(self):
+        contents = (
+            "4 March 2024 - 5 March 2024\n\n# History 201\n\n"
+            "- Tue 5\nReview notes\n\n- Mon 4\nRead chapter 12\n"
+        )
+        tree = ScheduleTransformer().transform(get_parser().parse(contents))
+        for schedule in (
+            parse_str(contents, "test.ptsched"),
+            validate_schedule(tree, contents, "test.ptsched"),
+        ):
+            self.assertEqual(
+                [day.date for day in schedule.days],
+                [datetime.date(2024, 3, 4), datetime.date(2024, 3, 5)],
+            )
+
+    def test_validation_errors(self):
+        contents = SCHEDULE.replace("- Tue 5", "- Wed 5").replace("- Mon 4", "- Mon 9")
+        with self.assertRaises(ValidationErrors) as context:
+            parse_str(contents, "test.ptsched")
+
+        errors = context.exception.errors
+        self.assertEqual(
+            [(error.line, error.column) for error in errors],
+            [(5, 1), (5, 1), (8, 1), (3, 1)],
+        )
+        messages = list(context.exception.format_errors())
+        self.assertEqual(len(messages), len(errors))
+        self.assertIn("test.ptsched:8", messages[2])
+        self.assertIn("   8 | - Wed 5\n", messages[2])
+
+    def test_dates_that_do_not_exist(self):
+        for contents, message in [
+            (
+                "31 April 2024 - 30 May 2024\n\n# History 201\n\n- Fri 3\nRead\n",
+                "Date does not exist",
+            ),
+            (
+                "1 April 2024 - 30 April 2024\n\n# History 201\n\n- Wed 31\nRead\n",
+                "Day 31 does not exist",
+            ),
+        ]:
+            with self.assertRaises(ValidationErrors) as context:
+                parse_str(contents, "test.ptsched")
+            self.assertIn(message, "".join(context.exception.format_errors()))
+
+    def test_error_messages(self):
+        for contents, message in [
+            ("1 January 2024 31 January 2024\n", "Missing dash in metadata"),
+            ("4 March 2024 - 5 March 2024", "Only metadata, no body"),
+            (
+                "4 March 2024 - 5 March 2024\n\n# History 201\n\n# Physics 150\n",
+                "Class with no days",
+            ),
+            (
+                "4 March 2024 - 5 March 2024\n\n# History 201\n\n- Tues 5\n",
+                "Invalid day of week",
+            ),
+        ]:
+            with self.assertRaises(UnexpectedInput) as context:
+                get_parser().parse(contents)
+            self.assertIn(
+                message,
+                lark_error_handler(context.exception, contents, "test.ptsched"),
+            )
+
+    def test_classifier_matches_examples(self):
+        inputs = [
+            malformed for examples in ERROR_EXAMPLES.values() for malformed in examples
+        ]
+        # Near misses of the catalogue reach states it does not cover.
+        inputs += [
+            malformed[:index] + malformed[index + 1 :]
+            for malformed in inputs
+            for index in range(0, len(malformed), 7)
+        ]
+
+        for contents in inputs:
+            try:
+                get_parser().parse(contents)
+            except UnexpectedInput as error:
+                self.assertEqual(
+                    get_error_classifier().classify(error),
+                    error.match_examples(get_parser().parse, ERROR_EXAMPLES),
+                    msg=repr(contents),
+                )
+
+
+class Test_parser_startup(unittest.TestCase):
+    def run_startup(self, cache_home):
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT],
+            env=dict(os.environ, XDG_CACHE_HOME=cache_home),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        elapsed, cached = result.stdout.split()
+        return float(elapsed), cached == "True"
+
+    def test_startup_budget(self):
+        with tempfile.TemporaryDirectory() as cache_home:
+            _, cached = self.run_startup(cache_home)
+            self.assertTrue(cached)
+
+            elapsed, _ = min(self.run_startup(cache_home) for _ in range(3))
+            self.assertLess(elapsed, PARSER_STARTUP_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
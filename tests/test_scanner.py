@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+import os
+import re
+import unittest
+
+from lark.exceptions import UnexpectedInput
+
+from ptsched.parse.parse import parse_str
+from ptsched.parse.parser import get_parser
+from ptsched.parse.scanner import ScanError, scan_schedule
+from ptsched.parse.transformer import ScheduleTransformer
+from ptsched.parse.validate import ValidationErrors, validate_schedule
+
+
+def lark_parse_str(contents, filename):
+    transformed = ScheduleTransformer().transform(get_parser().parse(contents))
+    return validate_schedule(transformed, contents, filename)
+
+
+def dump(schedule):
+    return (
+        schedule.metadata.start_date,
+        schedule.metadata.end_date,
+        [
+            (
+                str(day.date),
+                [(c.name, [task.name for task in c.tasks]) for c in day.classes],
+            )
+            for day in schedule.days
+        ],
+    )
+
+
+def variants(contents):
+    """Well-formed rewrites of a schedule that the scanner must handle."""
+    yield contents
+    yield contents.rstrip("\n")
+    yield "\n\n  " + contents
+    yield contents.replace("\n", "\r\n")
+    yield re.sub(r"\n\n+", "\n", contents)
+    yield re.sub(r"\n(?=[^\n])", "\n\t ", contents)
+    yield contents.replace("\n- ", "\n-  ").replace("\n\n", "\n \f\n")
+
+
+def input_files():
+    for directory, _, files in os.walk("tests/test_data/input"):
+        for file in files:
+            if file.endswith(".ptsched"):
+                with open(os.path.join(directory, file)) as input_file:
+                    yield file, input_file.read()
+
+
+class Test_scanner(unittest.TestCase):
+    def test_matches_lark(self):
+        for filename, contents in input_files():
+            for variant in variants(contents):
+                with self.subTest(filename=filename, variant=variant[:40]):
+                    self.assertEqual(
+                        dump(scan_schedule(variant)),
+                        dump(lark_parse_str(variant, filename)),
+                    )
+
+    def test_falls_back_with_lark_diagnostics(self):
+        for filename, contents in input_files():
+            broken = [
+                contents.replace("# ", "#", 1),
+                contents.replace("\n- ", "\n-- ", 1),
+                contents.replace(" - ", " ", 1),
+                re.sub(r"\n- \w+ ", "\n- Sun ", contents, count=1),
+                contents + "\n# " + contents.split("# ")[1],
+            ]
+            for variant in broken:
+                with self.subTest(filename=filename, variant=variant[:40]):
+                    with self.assertRaises(ScanError):
+                        scan_schedule(variant)
+                    with self.assertRaises((UnexpectedInput, ValidationErrors)):
+                        lark_parse_str(variant, filename)
+                    with self.assertRaises((UnexpectedInput, ValidationErrors)):
+                        parse_str(variant, filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
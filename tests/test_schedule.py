@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from ptsched.event_helper import HelperError
+from ptsched.init import init
+from ptsched.schedule import schedule, schedule_file
+
+INPUT_DIRECTORY = "tests/test_data/input/basic24"
+EXPECTED_DIRECTORY = "tests/test_data/expected-output-md/basic24"
+
+
+class Test_schedule(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = temporary_directory.name
+        shutil.copytree(INPUT_DIRECTORY, os.path.join(self.directory, "term"))
+        environment = mock.patch.dict(
+            os.environ, XDG_CACHE_HOME=os.path.join(self.directory, "cache")
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+
+        working_directory = os.getcwd()
+        self.expected = {}
+        for file in os.listdir(INPUT_DIRECTORY):
+            with open(os.path.join(EXPECTED_DIRECTORY, file, "out.txt")) as expected:
+                self.expected[file.removesuffix(".ptsched") + ".md"] = expected.read()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, working_directory)
+
+    def schedule(self, **kwargs):
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            schedule(no_vcs=True, no_syscal=True, **kwargs)
+        return errors.getvalue()
+
+    def output(self, file):
+        with open(os.path.join("out", "term", file)) as output_file:
+            return output_file.read()
+
+    def test_outputs(self):
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                shutil.rmtree("out", ignore_errors=True)
+                self.assertEqual(self.schedule(jobs=jobs), "")
+                for file, expected in self.expected.items():
+                    self.assertEqual(self.output(file), expected)
+
+    def test_checked_tasks_kept(self):
+        self.schedule(jobs=1)
+        with open(os.path.join("out", "term", "2024-03-04.md"), "w") as output_file:
+            output_file.write(
+                self.expected["2024-03-04.md"].replace(
+                    "- [ ] Review notes", "- [x] Review notes"
+                )
+            )
+        self.schedule(jobs=1)
+        self.assertIn("- [x] Review notes", self.output("2024-03-04.md"))
+
+    def test_failure_does_not_stop_others(self):
+        with open(os.path.join("term", "broken.ptsched"), "w") as broken:
+            broken.write("4 March 2024 31 March 2024\n")
+
+        errors = io.StringIO()
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(errors):
+            schedule(no_vcs=True, no_syscal=True, jobs=2)
+        self.assertIn("broken.ptsched:1 - Missing dash in metadata", errors.getvalue())
+        for file, expected in self.expected.items():
+            self.assertEqual(self.output(file), expected)
+        self.assertFalse(os.path.exists(os.path.join("out", "term", "broken.md")))
+
+    def test_unreadable_and_bad_day_do_not_stop_others(self):
+        with open(os.path.join("term", "binary.ptsched"), "wb") as binary:
+            binary.write(b"4 March 2024 - 5 March 2024\n\xff\xfe\n")
+        with open(os.path.join("term", "april.ptsched"), "w") as april:
+            april.write(
+                "1 April 2024 - 30 April 2024\n\n# History 201\n\n- Wed 31\nRead\n"
+            )
+
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                shutil.rmtree("out", ignore_errors=True)
+                errors = io.StringIO()
+                with self.assertRaises(SystemExit), contextlib.redirect_stderr(errors):
+                    schedule(no_vcs=True, no_syscal=True, jobs=jobs)
+                self.assertIn("binary.ptsched", errors.getvalue())
+                self.assertIn("Day 31 does not exist", errors.getvalue())
+                for file, expected in self.expected.items():
+                    self.assertEqual(self.output(file), expected)
+
+    def rendered_files(self, **kwargs):
+        """Runs schedule and returns the input files it rendered."""
+        with mock.patch(
+            "ptsched.schedule.schedule_file", wraps=schedule_file
+        ) as schedule_file_mock:
+            self.assertEqual(self.schedule(jobs=1, **kwargs), "")
+        return sorted(
+            os.path.basename(call.args[0][0])
+            for call in schedule_file_mock.call_args_list
+        )
+
+    def test_manifest(self):
+        init()
+        all_files = sorted(os.listdir("term"))
+        self.assertEqual(self.rendered_files(), all_files)
+        self.assertEqual(self.rendered_files(), [])
+        self.assertEqual(self.rendered_files(force=True), all_files)
+
+        # Touched but unchanged files are not rendered again.
+        input_file = os.path.join("term", "2024-03-04.ptsched")
+        os.utime(input_file, ns=(0, 0))
+        self.assertEqual(self.rendered_files(), [])
+
+        with open(input_file, "a") as file:
+            file.write("\n")
+        self.assertEqual(self.rendered_files(), ["2024-03-04.ptsched"])
+
+        os.remove(os.path.join("out", "term", "2024-03-01.md"))
+        self.assertEqual(self.rendered_files(), ["2024-03-01.ptsched"])
+
+        with open(os.path.join("out", "term", "2024-03-01.md"), "w") as output_file:
+            output_file.write(
+                self.expected["2024-03-01.md"].replace("- [ ] ", "- [x] ", 1)
+            )
+        self.assertEqual(self.rendered_files(), ["2024-03-01.ptsched"])
+        self.assertEqual(self.rendered_files(), [])
+        self.assertEqual(self.output("2024-03-01.md").count("- [x] "), 1)
+
+    def git(self, *arguments):
+        return subprocess.run(
+            ["git", *arguments], capture_output=True, text=True, check=True
+        ).stdout
+
+    def test_vcs(self):
+        self.git("init", "-q")
+        self.git("config", "user.name", "Test")
+        self.git("config", "user.email", "test@example.com")
+        init()
+        with open("notes.txt", "w") as notes:
+            notes.write("Not a schedule\n")
+
+        def schedule_with_vcs():
+            errors = io.StringIO()
+            with contextlib.redirect_stderr(errors):
+                schedule(no_syscal=True, quiet=True, verbose=True, jobs=1)
+            return errors.getvalue()
+
+        self.assertIn("vcs: 2 files in", schedule_with_vcs())
+        self.assertEqual(
+            self.git("show", "--name-only", "--format=").split(),
+            ["term/2024-03-01.ptsched", "term/2024-03-04.ptsched"],
+        )
+
+        # Nothing changed, so nothing is committed.
+        self.assertIn("vcs: 0 files in", schedule_with_vcs())
+        self.assertEqual(len(self.git("log", "--format=%H").split()), 1)
+
+        with open(os.path.join("term", "2024-03-04.ptsched"), "a") as file:
+            file.write("\n")
+        schedule_with_vcs()
+        self.assertEqual(
+            self.git("show", "--name-only", "--format=").split(),
+            ["term/2024-03-04.ptsched"],
+        )
+        self.assertIn("?? notes.txt", self.git("status", "--porcelain"))
+
+    def test_uncommitted_files_staged_later(self):
+        self.git("init", "-q")
+        self.git("config", "user.name", "Test")
+        self.git("config", "user.email", "test@example.com")
+        init()
+        os.rename(
+            os.path.join("term", "2024-03-01.ptsched"),
+            os.path.join("term", "2024-03-0[1].ptsched"),
+        )
+
+        self.schedule(jobs=1)
+        self.assertEqual(self.git("log", "--all", "--format=%H"), "")
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            schedule(no_syscal=True, quiet=True, jobs=1)
+        self.assertEqual(
+            sorted(self.git("show", "--name-only", "--format=").split()),
+            ["term/2024-03-04.ptsched", "term/2024-03-0[1].ptsched"],
+        )
+
+    def test_no_helper(self):
+        errors = io.StringIO()
+        with (
+            mock.patch.dict(os.environ),
+            mock.patch("ptsched.event_helper.bundled_helper", return_value=None),
+            contextlib.redirect_stderr(errors),
+        ):
+            os.environ.pop("PTSCHED_EVENT_HELPER", None)
+            schedule(no_vcs=True, jobs=1)
+        self.assertIn("event-helper is not installed", errors.getvalue())
+        for file, expected in self.expected.items():
+            self.assertEqual(self.output(file), expected)
+
+    def test_failed_sync_still_committed(self):
+        self.git("init", "-q")
+        self.git("config", "user.name", "Test")
+        self.git("config", "user.email", "test@example.com")
+        init()
+
+        errors = io.StringIO()
+        with (
+            mock.patch(
+                "ptsched.syscal.helper_command",
+                side_effect=HelperError("event-helper exited early"),
+            ),
+            self.assertRaises(SystemExit),
+            contextlib.redirect_stderr(errors),
+        ):
+            schedule(quiet=True, jobs=1, helper="event-helper")
+        self.assertIn("event-helper exited early", errors.getvalue())
+        self.assertEqual(
+            self.git("show", "--name-only", "--format=").split(),
+            ["term/2024-03-01.ptsched", "term/2024-03-04.ptsched"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+import datetime
+import os
+import random
+import unittest
+
+from ptsched.parse.parse import parse_str
+from ptsched.structures import (
+    DayTransformed,
+    ScheduleTransformed,
+    SchoolClassTransformed,
+    Task,
+)
+
+INPUT_DIRECTORY = "tests/test_data/input"
+
+
+def by_day(schedule):
+    return [
+        (
+            day.date,
+            [
+                (class_.name, [task.name for task in class_.tasks])
+                for class_ in day.classes
+            ],
+        )
+        for day in schedule.days
+    ]
+
+
+def by_class(schedule):
+    return [
+        (
+            class_.name,
+            [(day.date, [task.name for task in day.tasks]) for day in class_.days],
+        )
+        for class_ in schedule.classes
+    ]
+
+
+def random_schedule(generator):
+    # Like the parser, every day lists its classes in one order, and a class
+    # comes after those seen on earlier days. Classes may skip days.
+    start = datetime.date(2024, 1, 1) + datetime.timedelta(
+        days=generator.randrange(365)
+    )
+    first_days = sorted(generator.randrange(60) for _ in range(generator.randint(1, 8)))
+    classes = [
+        (first_day, f"Course {number}") for number, first_day in enumerate(first_days)
+    ]
+    days = []
+    for offset in range(60):
+        day_classes = [
+            SchoolClassTransformed(
+                name,
+                [Task(f"{name} task {task}") for task in range(generator.randrange(4))],
+            )
+            for first_day, name in classes
+            if first_day == offset or (first_day < offset and generator.random() < 0.4)
+        ]
+        if day_classes:
+            days.append(
+                DayTransformed(start + datetime.timedelta(days=offset), day_classes)
+            )
+    return ScheduleTransformed(
+        ScheduleTransformed.Metadata(start, start + datetime.timedelta(days=59)), days
+    )
+
+
+class Test_structures(unittest.TestCase):
+    def test_to_reverse(self):
+        filename = os.path.join(INPUT_DIRECTORY, "basic24", "2024-03-01.ptsched")
+        with open(filename) as input_file:
+            schedule = parse_str(input_file.read(), filename)
+        reverse = schedule.to_reverse()
+
+        self.assertIs(reverse.metadata, schedule.metadata)
+        self.assertEqual(
+            [class_.name for class_ in reverse.classes],
+            list(
+                dict.fromkeys(
+                    class_.name for day in schedule.days for class_ in day.classes
+                )
+            ),
+        )
+        for class_ in reverse.classes:
+            dates = [day.date for day in class_.days]
+            self.assertEqual(dates, sorted(set(dates)))
+        self.assertEqual(by_day(reverse.to_transformed()), by_day(schedule))
+
+    def test_round_trip(self):
+        generator = random.Random(25)
+        for _ in range(200):
+            schedule = random_schedule(generator)
+            reverse = schedule.to_reverse()
+            transformed = reverse.to_transformed()
+            self.assertEqual(by_day(transformed), by_day(schedule))
+            self.assertEqual(by_class(transformed.to_reverse()), by_class(reverse))
+            self.assertEqual(
+                sum(len(class_.days) for class_ in reverse.classes),
+                sum(len(day.classes) for day in schedule.days),
+            )
+
+    def test_to_transformed_merges_days(self):
+        schedule = random_schedule(random.Random(2))
+        reverse = schedule.to_reverse()
+        reverse.classes.reverse()
+        dates = [day.date for day in reverse.to_transformed().days]
+        self.assertEqual(dates, sorted(set(dates)))
+        self.assertEqual(dates, [day.date for day in schedule.days])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+import contextlib
+import io
+import json
+import os
+import shlex
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from ptsched import event_helper
+from ptsched import syscal as syscal_module
+from ptsched.event_helper import HelperSession
+from ptsched.ledger import LEDGER_NAME
+from ptsched.syscal import sync_files, syscal
+
+STUB = os.path.join(os.path.dirname(__file__), "event_helper_stub.py")
+SCHEDULE_FILE = "tests/test_data/input/basic24/2024-03-04.ptsched"
+OTHER_SCHEDULE_FILE = "tests/test_data/input/basic24/2024-03-01.ptsched"
+
+
+class Test_sync(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = temporary_directory.name
+        open(os.path.join(self.directory, ".ptscheddir"), "w").close()
+        os.mkdir(os.path.join(self.directory, "term"))
+        self.filename = os.path.join(self.directory, "term", "2024-03-04.ptsched")
+        shutil.copy(SCHEDULE_FILE, self.filename)
+        self.calendar_file = os.path.join(self.directory, "calendar.json")
+        environment = mock.patch.dict(
+            os.environ, XDG_CACHE_HOME=os.path.join(self.directory, "cache")
+        )
+        environment.start()
+        self.addCleanup(environment.stop)
+
+    def syscal(self, *helper_arguments, **kwargs):
+        helper = shlex.join(
+            [sys.executable, STUB, "--calendar", self.calendar_file, *helper_arguments]
+        )
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            syscal(filename=self.filename, helper=helper, **kwargs)
+        return output.getvalue().strip()
+
+    def edit(self, old, new):
+        with open(self.filename) as schedule_file:
+            contents = schedule_file.read()
+        with open(self.filename, "w") as schedule_file:
+            schedule_file.write(contents.replace(old, new))
+
+    def extend_range(self):
+        self.edit("8 Mar", "9 Mar")
+        self.edit("# Physics", "- Sat 9\n\n# Physics")
+        with open(self.filename, "a") as schedule_file:
+            schedule_file.write("\n- Sat 9\n")
+
+    def calendar(self):
+        with open(self.calendar_file) as calendar_file:
+            return json.load(calendar_file)
+
+    def test_only_changes_are_sent(self):
+        self.assertEqual(
+            self.syscal(), "5 days updated, 0 removed, 0 unchanged days skipped"
+        )
+        self.assertEqual(
+            self.syscal(), "0 days updated, 0 removed, 5 unchanged days skipped"
+        )
+
+        self.edit("Review notes", "Review notes again")
+        self.assertEqual(
+            self.syscal(), "1 days updated, 0 removed, 4 unchanged days skipped"
+        )
+        self.assertIn(
+            "Review notes again",
+            [event["contents"] for event in self.calendar().values()][1],
+        )
+
+        self.assertEqual(
+            self.syscal(all=True), "5 days updated, 0 removed, 0 unchanged days skipped"
+        )
+
+    def test_removed_days(self):
+        self.syscal()
+        self.edit("4 March 2024 - 8 March 2024", "4 Mar 2024 - 8 Mar 2024")
+        self.assertEqual(
+            self.syscal(), "0 days updated, 0 removed, 5 unchanged days skipped"
+        )
+
+        # Moving the range gives every day a new event.
+        self.extend_range()
+        self.assertEqual(
+            self.syscal(), "6 days updated, 5 removed, 0 unchanged days skipped"
+        )
+        self.assertEqual(len(self.calendar()), 6)
+
+    @mock.patch.object(event_helper, "GREETING_TIMEOUT", 0.2)
+    def test_protocol_1_keeps_deletions(self):
+        self.syscal()
+        self.extend_range()
+        self.syscal("--v1-only")
+        with open(os.path.join(self.directory, LEDGER_NAME)) as ledger_file:
+            events = json.load(ledger_file)["files"]["term/2024-03-04.ptsched"]
+        self.assertEqual(len(events), 11)
+
+    def test_failed_sync_is_not_recorded(self):
+        with self.assertRaises(SystemExit):
+            self.syscal("--fail-on", "2024-03-05")
+        self.assertFalse(os.path.exists(os.path.join(self.directory, LEDGER_NAME)))
+        self.assertEqual(
+            self.syscal(), "5 days updated, 0 removed, 0 unchanged days skipped"
+        )
+
+    def test_one_session_for_many_files(self):
+        other_filename = os.path.join(self.directory, "term", "2024-03-01.ptsched")
+        shutil.copy(OTHER_SCHEDULE_FILE, other_filename)
+        helper = shlex.join([sys.executable, STUB, "--calendar", self.calendar_file])
+
+        output = io.StringIO()
+        with mock.patch.object(
+            syscal_module, "HelperSession", wraps=HelperSession
+        ) as session_class:
+            with contextlib.redirect_stdout(output):
+                sync_files([self.filename, other_filename], helper=helper)
+        self.assertEqual(session_class.call_count, 1)
+
+        with open(os.path.join(self.directory, LEDGER_NAME)) as ledger_file:
+            files = json.load(ledger_file)["files"]
+        self.assertEqual(
+            sorted(files), ["term/2024-03-01.ptsched", "term/2024-03-04.ptsched"]
+        )
+        self.assertEqual(
+            len(self.calendar()), sum(len(events) for events in files.values())
+        )
+
+        # Nothing changed, so the helper is not started at all.
+        with mock.patch.object(syscal_module, "HelperSession") as session_class:
+            with contextlib.redirect_stdout(output):
+                sync_files([self.filename, other_filename], helper=helper)
+        session_class.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
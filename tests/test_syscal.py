@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+import io
+import os
+import re
+import unittest
+
+from ptsched.parse.outputs import write_default
+from ptsched.parse.parse import parse_str
+from ptsched.event_helper import UPDATE, Request
+from ptsched.syscal import plan_sync
+
+# How syscal used to split the normal output format back into days.
+DAY_PATTERN = re.compile(
+    r"(\d{4}-\d{2}-\d{2}):\n\n((?:.(?!\d{4}-\d{2}-\d{2}:\n\n))+)", re.DOTALL
+)
+
+
+def schedules():
+    for directory, _, files in os.walk("tests/test_data/input"):
+        for file in sorted(files):
+            filename = os.path.join(directory, file)
+            with open(filename) as input_file:
+                yield filename, parse_str(input_file.read(), filename)
+
+
+class Test_syscal(unittest.TestCase):
+    def test_matches_rendered_output(self):
+        for filename, schedule in schedules():
+            outfile = io.StringIO()
+            write_default(schedule, outfile)
+            expected = [
+                (day[1], day[2].removesuffix("\n"))
+                for day in DAY_PATTERN.finditer(outfile.getvalue())
+            ]
+            requests, _, skipped = plan_sync(schedule, {})
+            self.assertEqual(skipped, 0)
+            self.assertEqual(
+                [(request.date, request.payload) for request in requests],
+                expected,
+                msg=filename,
+            )
+
+    def test_request_format(self):
+        request = Request(UPDATE, "event", "2024-03-04", "History 201:\nRead")
+        self.assertEqual(
+            request.encode_v1(3),
+            b"3\nUPDATE\n2024-03-04\nHistory 201:\nRead\nEND REQUEST\n",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ptsched.parse.templates import get_template, template_cache_directory
+from ptsched.structures import DayTransformed, SchoolClassTransformed, Task
+
+DAY = DayTransformed(
+    "2024-03-04", [SchoolClassTransformed("History 201", [Task("Read chapter 12")])]
+)
+
+
+class Test_templates(unittest.TestCase):
+    def setUp(self):
+        get_template.cache_clear()
+        self.addCleanup(get_template.cache_clear)
+
+    def test_compiled_once(self):
+        self.assertIs(get_template("default"), get_template("default"))
+
+    def test_module_cache(self):
+        with tempfile.TemporaryDirectory() as cache_home:
+            with mock.patch.dict(os.environ, XDG_CACHE_HOME=cache_home):
+                template = get_template("markdown")
+                modules = os.listdir(template_cache_directory())
+
+        self.assertEqual(len(modules), 1)
+        self.assertTrue(modules[0].startswith("markdown-"))
+        self.assertIn("## History 201", template.render(day=DAY))
+
+    def test_unwritable_cache(self):
+        with tempfile.NamedTemporaryFile() as not_a_directory:
+            with mock.patch.dict(os.environ, XDG_CACHE_HOME=not_a_directory.name):
+                self.assertIn(
+                    "## History 201", get_template("markdown").render(day=DAY)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+import os
+import stat
+import tempfile
+import unittest
+
+from ptsched.update import update_file, update_str
+
+SCHEDULE = """# Tasks: 2024-03-04
+
+## History 201
+
+- [ ] Read chapter 12
+- [ ] Take notes
+
+## Physics 150
+
+- [ ] Read chapter 12
+- [ ] Take notes
+
+# Tasks: 2024-03-05
+
+## History 201
+
+- [ ] Take notes
+"""
+
+
+def check(schedule, class_heading, task, date="2024-03-04"):
+    """Checks the first matching task under the given headings."""
+    lines = schedule.splitlines(keepends=True)
+    current_date = current_class = None
+    for index, line in enumerate(lines):
+        if line.startswith("# Tasks: "):
+            current_date = line.strip()[len("# Tasks: ") :]
+        elif line.startswith("## "):
+            current_class = line.strip()[3:]
+        elif (current_date, current_class, line) == (
+            date,
+            class_heading,
+            f"- [ ] {task}\n",
+        ):
+            lines[index] = f"- [x] {task}\n"
+            break
+    return "".join(lines)
+
+
+class Test_update(unittest.TestCase):
+    def test_unchanged(self):
+        current = check(SCHEDULE, "Physics 150", "Take notes")
+        self.assertEqual(update_str(SCHEDULE, current), current)
+
+    def test_new_file(self):
+        self.assertEqual(update_str(SCHEDULE, ""), SCHEDULE)
+
+    def test_same_task_elsewhere_stays_unchecked(self):
+        current = check(SCHEDULE, "History 201", "Take notes", "2024-03-05")
+        result = update_str(SCHEDULE, current)
+        self.assertEqual(result.count("- [x]"), 1)
+        self.assertTrue(result.endswith("- [x] Take notes\n"))
+
+    def test_reordered(self):
+        current = check(SCHEDULE, "History 201", "Read chapter 12")
+        reordered = SCHEDULE.replace(
+            "- [ ] Read chapter 12\n- [ ] Take notes\n\n## Physics",
+            "- [ ] Take notes\n- [ ] Extra reading\n- [ ] Read chapter 12\n\n## Physics",
+        )
+        result = update_str(reordered, current)
+        self.assertIn(
+            "## History 201\n\n- [ ] Take notes\n- [ ] Extra reading\n"
+            "- [x] Read chapter 12\n",
+            result,
+        )
+        self.assertEqual(result.count("- [x]"), 1)
+
+    def test_repeated_tasks(self):
+        schedule = SCHEDULE.replace(
+            "- [ ] Take notes\n\n# Tasks: 2024-03-05",
+            "- [ ] Take notes\n- [ ] Take notes\n\n# Tasks: 2024-03-05",
+        )
+        lines = schedule.splitlines(keepends=True)
+        # Check the second "Take notes" under Physics 150.
+        index = [
+            number for number, line in enumerate(lines) if line == "- [ ] Take notes\n"
+        ][2]
+        lines[index] = "- [x] Take notes\n"
+        current = "".join(lines)
+        self.assertEqual(update_str(schedule, current), current)
+
+    def test_removed_task(self):
+        current = check(SCHEDULE, "History 201", "Read chapter 12")
+        result = update_str(SCHEDULE.replace("- [ ] Read chapter 12\n", "", 1), current)
+        self.assertNotIn("[x]", result)
+
+
+class Test_update_file(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "out", "schedule.md")
+
+    def test_new_file(self):
+        self.assertTrue(update_file(SCHEDULE, self.filename))
+        with open(self.filename) as file:
+            self.assertEqual(file.read(), SCHEDULE)
+
+    def test_unchanged_file_is_not_written(self):
+        update_file(SCHEDULE, self.filename)
+        with open(self.filename, "w") as file:
+            file.write(check(SCHEDULE, "History 201", "Take notes"))
+        os.utime(self.filename, ns=(0, 0))
+        inode = os.stat(self.filename).st_ino
+
+        self.assertFalse(update_file(SCHEDULE, self.filename))
+        self.assertEqual(os.stat(self.filename).st_mtime_ns, 0)
+        self.assertEqual(os.stat(self.filename).st_ino, inode)
+
+    def test_changed_file_is_replaced(self):
+        update_file(SCHEDULE, self.filename)
+        current = check(SCHEDULE, "Physics 150", "Read chapter 12")
+        with open(self.filename, "w") as file:
+            file.write(current)
+        os.chmod(self.filename, 0o640)
+
+        extended = SCHEDULE + "- [ ] Review notes\n"
+        self.assertTrue(update_file(extended, self.filename))
+        with open(self.filename) as file:
+            self.assertEqual(file.read(), current + "- [ ] Review notes\n")
+        self.assertEqual(stat.S_IMODE(os.stat(self.filename).st_mode), 0o640)
+        self.assertEqual(os.listdir(os.path.dirname(self.filename)), ["schedule.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+import os
+import tempfile
+import unittest
+
+from ptsched import utils
+
+
+class Test_utils(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        for name in [
+            "term/a.ptsched",
+            "term/notes.txt",
+            "term/unit/b.ptsched",
+            "ignored/c.ptsched",
+            "ignored/.ptschedignore",
+            "ignored/nested/d.ptsched",
+            "out/term/a.ptsched",
+            ".git/e.ptsched",
+            "f.ptsched",
+        ]:
+            self.write(name)
+
+    def write(self, name):
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w"):
+            pass
+        return path
+
+    def relative_files(self, index=None):
+        return [
+            os.path.relpath(file, self.directory)
+            for file in utils.find_files(self.directory, index)
+        ]
+
+    def test_find_files(self):
+        self.assertEqual(
+            self.relative_files(),
+            ["f.ptsched", "term/a.ptsched", "term/unit/b.ptsched"],
+        )
+
+    def test_file_pairs(self):
+        self.assertIn(
+            (
+                os.path.join(self.directory, "term", "unit", "b.ptsched"),
+                os.path.join(self.directory, "out", "term", "unit", "b.md"),
+            ),
+            utils.find_file_pairs(self.directory),
+        )
+
+    def test_scan_index(self):
+        index_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(index_directory.cleanup)
+        index_path = os.path.join(index_directory.name, "scan-index.json")
+        index = utils.ScanIndex.load(index_path)
+        expected = self.relative_files()
+        self.assertEqual(self.relative_files(index), expected)
+        listed = index.listings
+        self.assertGreater(listed, 0)
+
+        # Directories modified just before they were listed are listed again.
+        self.assertEqual(self.relative_files(index), expected)
+        self.assertEqual(index.listings, 2 * listed)
+
+        for directory in index.directories:
+            os.utime(directory, ns=(0, 0))
+        self.assertEqual(self.relative_files(index), expected)
+        index.save()
+
+        index = utils.ScanIndex.load(index_path)
+        self.assertEqual(self.relative_files(index), expected)
+        self.assertEqual(index.listings, 0)
+
+        new_file = self.write("term/unit/g.ptsched")
+        self.assertIn(
+            os.path.relpath(new_file, self.directory), self.relative_files(index)
+        )
+        self.assertEqual(index.listings, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from ptsched.watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    collect_changes,
+    run_pipeline,
+)
+
+
+class FakeWatcher:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.timeouts = []
+
+    def changes(self, timeout=None):
+        self.timeouts.append(timeout)
+        return self.batches.pop(0) if self.batches else set()
+
+
+class Test_watch(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        for name in ("term", "out", "ignored"):
+            os.mkdir(os.path.join(self.directory, name))
+        self.write("ignored/.ptschedignore")
+
+    def write(self, name, contents=""):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as file:
+            file.write(contents)
+        return path
+
+    def assertWatches(self, watcher):
+        self.addCleanup(watcher.close)
+        self.assertEqual(watcher.changes(0.1), set())
+
+        schedule_file = self.write("term/a.ptsched")
+        self.write("term/notes.txt")
+        self.write("out/a.ptsched")
+        self.write("ignored/b.ptsched")
+        self.assertEqual(watcher.changes(0.5), {schedule_file})
+
+        # Editors often save by renaming a new file over the old one.
+        temporary_file = self.write("term/a.ptsched.tmp", "changed")
+        os.replace(temporary_file, schedule_file)
+        self.assertEqual(watcher.changes(0.5), {schedule_file})
+
+        os.makedirs(os.path.join(self.directory, "new", "unit"))
+        watcher.changes(0.1)
+        new_file = self.write("new/unit/c.ptsched", "new")
+        self.assertEqual(watcher.changes(0.5), {new_file})
+
+        os.remove(schedule_file)
+        self.assertEqual(watcher.changes(0.5), {schedule_file})
+
+    @unittest.skipUnless(sys.platform == "linux", "inotify is Linux only")
+    def test_inotify(self):
+        self.assertWatches(InotifyWatcher(self.directory))
+
+    def test_polling(self):
+        self.assertWatches(PollingWatcher(self.directory, interval=0.05))
+
+    def test_debounce(self):
+        watcher = FakeWatcher([{"a"}, {"a", "b"}, {"c"}, set(), {"d"}])
+        self.assertEqual(
+            collect_changes(watcher, debounce=0.01, max_delay=10), {"a", "b", "c"}
+        )
+        self.assertEqual(watcher.timeouts[0], None)
+        self.assertEqual(collect_changes(watcher, debounce=0.01), {"d"})
+
+    def test_max_delay(self):
+        watcher = FakeWatcher([{str(number)} for number in range(100)])
+        self.assertEqual(collect_changes(watcher, debounce=0.01, max_delay=0), {"0"})
+
+    def test_failed_run_reported(self):
+        errors = io.StringIO()
+        with (
+            mock.patch(
+                "ptsched.watch.schedule_pairs", side_effect=ValueError("bad day")
+            ),
+            contextlib.redirect_stderr(errors),
+        ):
+            run_pipeline([("a.ptsched", "out/a.md")])
+        self.assertEqual(errors.getvalue(), "Error when scheduling: bad day\n")
+
+
+if __name__ == "__main__":
+    unittest.main()